@@ -0,0 +1,113 @@
+"""Micro-benchmark of the live data decoder against captured API responses.
+
+Run from the repository root:
+
+    python benchmarks/bench_decoder.py [--number N]
+
+Compares LiveDataDecoder with a plain json.loads loop that builds a dict per
+register, which is how live data was parsed before the decoder existed. The
+decoder decodes every response into a fresh snapshot, like the first poll of
+a device; "unchanged" decodes them again into a snapshot that already holds
+their samples, so every item takes the skip path for samples that are not
+newer.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+import timeit
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from custom_components.meltem.const import (  # noqa: E402
+    ADDITIONAL_REGISTERS,
+    REGISTER_DEFINITIONS,
+)
+from custom_components.meltem.coordinator import ALL_REGISTERS  # noqa: E402
+from custom_components.meltem.decoder import LiveDataDecoder  # noqa: E402
+from custom_components.meltem.snapshot import DeviceSnapshot, SnapshotStore  # noqa: E402
+
+CAPTURES = ("live.json", "meltem-session.json")
+
+
+def load_payloads() -> list[bytes]:
+    """Return the bodies of all captured live data responses."""
+    payloads = []
+    for name in CAPTURES:
+        for entry in json.loads((ROOT / "test-data" / name).read_text()):
+            if entry.get("path") != "/v1/device/data/live":
+                continue
+            text = entry["response"].get("body", {}).get("text")
+            if text:
+                payloads.append(text.encode())
+    return payloads
+
+
+def legacy_decode(payload: bytes) -> dict[int, dict]:
+    """Parse a live data response into per-register dicts."""
+    formatted = {}
+    for item in json.loads(payload).get("data", []):
+        address = item.get("address")
+        if address is None:
+            continue
+        if "status" in item:
+            if item["status"] == 1001:
+                continue
+            formatted[address] = {
+                "value": None,
+                "status": item["status"],
+                "last_update": item.get("lastUpdate"),
+            }
+            continue
+        value = item.get("value")
+        if value == "NaN" or value == 32767:
+            continue
+        if address in (41002, 41004) and isinstance(value, (int, float)) and value > 100:
+            continue
+        formatted[address] = {"value": value, "last_update": item.get("lastUpdate")}
+    return formatted
+
+
+def main() -> None:
+    """Run the benchmark and print the time per response."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="passes over all payloads")
+    args = parser.parse_args()
+
+    payloads = load_payloads()
+    store = SnapshotStore(ALL_REGISTERS)
+    decoder = LiveDataDecoder(store.index, {**REGISTER_DEFINITIONS, **ADDITIONAL_REGISTERS})
+    size = len(store.index)
+    # One snapshot per response holding its samples, for the unchanged pass
+    decoded = [DeviceSnapshot(size) for _ in payloads]
+    for payload, snapshot in zip(payloads, decoded):
+        decoder.decode(payload, snapshot, ALL_REGISTERS)
+
+    def run_legacy() -> None:
+        for payload in payloads:
+            legacy_decode(payload)
+
+    def run_decoder() -> None:
+        for payload in payloads:
+            decoder.decode(payload, DeviceSnapshot(size), ALL_REGISTERS)
+
+    def run_unchanged() -> None:
+        for payload, snapshot in zip(payloads, decoded):
+            decoder.decode(payload, snapshot, ALL_REGISTERS)
+
+    print(f"{len(payloads)} captured live data responses, {args.number} passes")
+    for name, func in (
+        ("legacy", run_legacy),
+        ("decoder", run_decoder),
+        ("unchanged", run_unchanged),
+    ):
+        seconds = min(timeit.repeat(func, number=args.number, repeat=3))
+        per_payload = seconds / (args.number * len(payloads)) * 1e6
+        print(f"{name:>9}: {per_payload:7.2f} µs per response")
+
+
+if __name__ == "__main__":
+    main()
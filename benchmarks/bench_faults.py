@@ -0,0 +1,226 @@
+"""Fault-injection benchmark of the update cycle and command retries.
+
+Run from the repository root:
+
+    python benchmarks/bench_faults.py [--scenario storm ...] [--duration 3600] [--units 8]
+
+Every scenario polls a synthetic fleet through a FaultInjectingSession for
+--duration seconds of virtual time, sending a manual speed command every
+--command-every seconds, so an hour of polling finishes in seconds. Each
+scenario is compared with a fault-free run with the same seed: request
+amplification is the ratio of the requests both runs sent, time to recovery
+is the time from the end of a fault until the first fresh, successful
+update cycle.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import tempfile
+from typing import Any
+
+from common import run_virtual
+from faults import Burst, FaultInjectingSession, FaultPlan, Latency
+from fleet import generate_fleet
+
+from homeassistant.core import CoreState, HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.meltem.api import MeltemApiClient
+from custom_components.meltem.const import (
+    API_LIVE_DATA_ENDPOINT,
+    API_SET_DATA_ENDPOINT,
+    DEFAULT_UPDATE_INTERVAL,
+    VENTILATION_MANUAL_MAX,
+    VENTILATION_MANUAL_MIN,
+)
+from custom_components.meltem.coordinator import MeltemCoordinator
+
+SCENARIOS: dict[str, FaultPlan] = {
+    "latency": FaultPlan(
+        latency={
+            API_LIVE_DATA_ENDPOINT: Latency(1.5, sigma=0.8),
+            API_SET_DATA_ENDPOINT: Latency(3.0, sigma=0.6),
+        },
+    ),
+    "session-expiry": FaultPlan(session_lifetime=900, session_expiries=(1234.5,)),
+    "5xx-burst": FaultPlan(bursts=(Burst(600, 120, 503), Burst(2400, 30, 502))),
+    "timeout-burst": FaultPlan(bursts=(Burst(600, 120, "timeout"),)),
+    "partial": FaultPlan(partial_rate=0.05),
+    "storm": FaultPlan(
+        latency={API_LIVE_DATA_ENDPOINT: Latency(0.8, sigma=0.8)},
+        session_lifetime=1200,
+        bursts=(
+            Burst(300, 90, 503),
+            Burst(1500, 60, "timeout"),
+            Burst(2700, 300, 500, frozenset({API_SET_DATA_ENDPOINT})),
+        ),
+        partial_rate=0.02,
+    ),
+}
+
+
+async def _async_send_command(
+    coordinator: MeltemCoordinator,
+    device_id: str,
+    percentage: int,
+    outcomes: list[bool],
+) -> None:
+    """Send a manual speed command and record whether it succeeded."""
+    try:
+        await coordinator.async_set_manual_speed(device_id, percentage)
+    except UpdateFailed:
+        outcomes.append(False)
+    else:
+        outcomes.append(True)
+
+
+async def async_run_scenario(
+    plan: FaultPlan,
+    units: int,
+    duration: float,
+    command_every: float,
+    seed: int,
+) -> dict[str, Any]:
+    """Poll a fleet with the given faults and return what happened."""
+    random.seed(seed)  # Retry jitter
+    fleet = generate_fleet(units, seed)
+    session = FaultInjectingSession(fleet, plan, seed)
+    hass = HomeAssistant(tempfile.mkdtemp())
+    hass.state = CoreState.running
+    client = MeltemApiClient("user", "password", session=session)
+    coordinator = MeltemCoordinator(hass, client)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    cycles: list[tuple[float, bool]] = []
+    commands: list[bool] = []
+    command_tasks = []
+    device_ids = list(fleet.devices)
+    next_command = command_every
+    rng = random.Random(seed)
+
+    while (now := loop.time() - start) < duration:
+        await coordinator.async_refresh()
+        fresh = coordinator.last_update_success and not coordinator.stale
+        cycles.append((now, fresh))
+        if now >= next_command and coordinator.data is not None:
+            next_command += command_every
+            command_tasks.append(
+                loop.create_task(
+                    _async_send_command(
+                        coordinator,
+                        rng.choice(device_ids),
+                        rng.randint(VENTILATION_MANUAL_MIN, VENTILATION_MANUAL_MAX),
+                        commands,
+                    )
+                )
+            )
+        # Wait for the next tick like the coordinator's own update interval
+        await asyncio.sleep(max(0.0, start + now + DEFAULT_UPDATE_INTERVAL - loop.time()))
+
+    await asyncio.gather(*command_tasks)
+    await coordinator.async_close()
+    await hass.async_stop(force=True)
+
+    metrics = client.metrics
+    return {
+        "cycles": len(cycles),
+        "failed_cycles": sum(not fresh for _, fresh in cycles),
+        "cycles_list": cycles,
+        "commands": len(commands),
+        "failed_commands": commands.count(False),
+        "requests": len(session.records),
+        "requests_by_endpoint": dict(session.requests),
+        "reauthentications": metrics.reauthentications,
+        "command_retries": metrics.command_retries,
+    }
+
+
+def _recoveries(plan: FaultPlan, cycles: list[tuple[float, bool]]) -> list[float | None]:
+    """Return the seconds from the end of every fault to the next fresh cycle.
+
+    Faults ending after the last cycle are left out, a fault without a fresh
+    cycle after it has no recovery, None.
+    """
+    last = cycles[-1][0] if cycles else 0.0
+    fault_ends = sorted(
+        end
+        for end in [burst.end for burst in plan.bursts] + list(plan.session_expiries)
+        if end <= last
+    )
+    recoveries = []
+    for end in fault_ends:
+        recovery = next((time - end for time, fresh in cycles if time >= end and fresh), None)
+        recoveries.append(recovery)
+    return recoveries
+
+
+async def async_benchmark(args: argparse.Namespace) -> dict[str, dict[str, Any]]:
+    """Run the clean baseline and every selected scenario."""
+    options = (args.units, args.duration, args.command_every, args.seed)
+    clean = await async_run_scenario(FaultPlan(), *options)
+    print(
+        f"{'clean':>14}: {clean['requests']} requests, {clean['cycles']} cycles, "
+        f"{clean['commands']} commands",
+        flush=True,
+    )
+
+    results = {}
+    for name in args.scenario:
+        plan = SCENARIOS[name]
+        result = await async_run_scenario(plan, *options)
+        result["amplification"] = result["requests"] / clean["requests"]
+        result["recovery_s"] = _recoveries(plan, result.pop("cycles_list"))
+        results[name] = result
+        recovery = ", ".join(
+            "never" if seconds is None else f"{seconds:.0f} s" for seconds in result["recovery_s"]
+        )
+        print(
+            f"{name:>14}: amplification {result['amplification']:.2f}x "
+            f"({result['requests']} requests), "
+            f"{result['failed_cycles']}/{result['cycles']} failed or stale cycles, "
+            f"{result['failed_commands']}/{result['commands']} failed commands, "
+            f"{result['command_retries']} retries, "
+            f"{result['reauthentications']} re-authentications"
+            + (f", recovery {recovery}" if recovery else ""),
+            flush=True,
+        )
+    return results
+
+
+def main() -> None:
+    """Parse the arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenario",
+        nargs="+",
+        choices=list(SCENARIOS),
+        default=list(SCENARIOS),
+        help="fault scenarios to run",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=3600, help="virtual seconds of polling per scenario"
+    )
+    parser.add_argument("--units", type=int, default=8, help="ventilation units in the fleet")
+    parser.add_argument(
+        "--command-every", type=float, default=120, help="virtual seconds between commands"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    parser.add_argument(
+        "--verbose", action="store_true", help="show the warnings logged while faults are injected"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING if args.verbose else logging.CRITICAL)
+
+    results = run_virtual(async_benchmark(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""Scale benchmark of the integration with a synthetic fleet of ventilation units.
+
+Run from the repository root:
+
+    python benchmarks/bench_fleet.py [--units 1 10 100 1000] [--check | --update-baseline]
+
+For every fleet size the integration is set up in a fresh Home Assistant
+instance against a FleetServer. The benchmark measures setup time, the
+number of entities created, update cycle wall time, event loop blocking,
+memory per device and state writes per second. With --check it exits with
+status 1 if a result is worse than the stored baseline by more than the
+tolerance. Baselines are machine specific, so record them with
+--update-baseline on the machine that runs the checks.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+from pathlib import Path
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+
+from common import async_add_entry, async_setup_hass, patch_api_host, run, summarize
+from fleet import FleetServer, generate_fleet
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.meltem.const import DOMAIN, POLL_INTERVAL_MAX
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "fleet.json"
+
+DEFAULT_UNITS = (1, 10, 100, 1000)
+
+# Results compared against the baseline, all of them lower is better. Loop lag is
+# checked at the 95th percentile, its maximum is a single sample of scheduler jitter
+CHECKED_RESULTS = (
+    "setup_s",
+    "cycle_ms_mean",
+    "cycle_ms_p95",
+    "loop_lag_ms_p95",
+    "memory_kib_per_device",
+)
+
+# Loop lag samples needed before its 95th percentile is more than the worst two samples
+LOOP_LAG_MIN_SAMPLES = 40
+
+
+class LoopMonitor:
+    """Measure how late a periodic task is woken up, in real time."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        """Initialize the monitor."""
+        self.interval = interval
+        self.lags: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start measuring."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop measuring."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - start - self.interval))
+
+
+async def _async_cycles(hass: HomeAssistant, cycles: int) -> list[float]:
+    """Run update cycles with every device due and return their wall times."""
+    coordinator = next(iter(hass.data[DOMAIN].values()))
+    loop = asyncio.get_running_loop()
+    durations = []
+    for _ in range(cycles):
+        loop.advance(POLL_INTERVAL_MAX)
+        start = time.perf_counter()
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+async def _async_stop(hass: HomeAssistant, server: FleetServer) -> None:
+    """Unload the integration and stop Home Assistant and the server."""
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_stop(force=True)
+    await server.stop()
+
+
+async def async_measure_timing(units: int, cycles: int, change_rate: float) -> dict[str, Any]:
+    """Set up the integration for a fleet and measure setup, cycles and state writes."""
+    server = FleetServer(generate_fleet(units), change_rate=change_rate)
+    patch_api_host(await server.start())
+    hass = await async_setup_hass(tempfile.mkdtemp())
+
+    state_writes = 0
+
+    def _count_state_write(_: Event) -> None:
+        nonlocal state_writes
+        state_writes += 1
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, _count_state_write)
+    monitor = LoopMonitor()
+    try:
+        start = time.perf_counter()
+        entry = await async_add_entry(hass)
+        setup = time.perf_counter() - start
+        entities = len(er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id))
+
+        state_writes = 0
+        monitor.start()
+        durations = await _async_cycles(hass, cycles)
+        await monitor.stop()
+    finally:
+        await _async_stop(hass, server)
+
+    cycle = summarize(durations)
+    lag = summarize(monitor.lags or [0.0])
+    return {
+        "setup_s": setup,
+        "entities": entities,
+        "entities_per_s": entities / setup,
+        "cycle_ms_mean": cycle["mean"] * 1000,
+        "cycle_ms_p95": cycle["p95"] * 1000,
+        "loop_lag_ms_p95": lag["p95"] * 1000,
+        "loop_lag_ms_max": lag["max"] * 1000,
+        "loop_lag_samples": len(monitor.lags),
+        "state_writes_per_cycle": state_writes / cycles,
+        "state_writes_per_s": state_writes / sum(durations),
+        "requests": dict(server.requests),
+    }
+
+
+async def async_measure_memory(units: int) -> dict[str, Any]:
+    """Set up the integration for a fleet and measure the memory it keeps per device."""
+    server = FleetServer(generate_fleet(units))
+    patch_api_host(await server.start())
+    hass = await async_setup_hass(tempfile.mkdtemp())
+    try:
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        await async_add_entry(hass)
+        await _async_cycles(hass, 2)
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+    finally:
+        await _async_stop(hass, server)
+    return {"memory_kib_per_device": retained / units / 1024}
+
+
+async def async_benchmark(args: argparse.Namespace) -> dict[str, dict[str, Any]]:
+    """Run the benchmark for every fleet size."""
+    results = {}
+    for units in args.units:
+        result = await async_measure_timing(units, args.cycles, args.change_rate)
+        result.update(await async_measure_memory(units))
+        results[str(units)] = result
+        print(
+            f"{units:>5} units: setup {result['setup_s']:.2f} s, "
+            f"{result['entities']} entities ({result['entities_per_s']:.0f}/s), "
+            f"cycle {result['cycle_ms_mean']:.1f} ms (p95 {result['cycle_ms_p95']:.1f} ms), "
+            f"loop lag p95 {result['loop_lag_ms_p95']:.1f} ms "
+            f"(max {result['loop_lag_ms_max']:.1f} ms), "
+            f"{result['memory_kib_per_device']:.1f} KiB/device, "
+            f"{result['state_writes_per_s']:.0f} state writes/s",
+            flush=True,
+        )
+    return results
+
+
+def checked_results(result: dict[str, Any]) -> tuple[str, ...]:
+    """Return the results of a fleet size to compare against the baseline.
+
+    Small fleets finish their cycles within a few loop lag samples, so their
+    loop lag is left out.
+    """
+    if result["loop_lag_samples"] < LOOP_LAG_MIN_SAMPLES:
+        return tuple(key for key in CHECKED_RESULTS if key != "loop_lag_ms_p95")
+    return CHECKED_RESULTS
+
+
+def check_regressions(
+    results: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, Any]],
+    tolerance: float,
+) -> list[str]:
+    """Return a description of every result worse than baseline * tolerance."""
+    regressions = []
+    for units, result in results.items():
+        for key in checked_results(result):
+            expected = baseline.get(units, {}).get(key)
+            if expected is None:
+                continue
+            # Tiny baselines are dominated by noise, allow at least 1 unit of slack
+            limit = max(expected * tolerance, expected + 1)
+            if result[key] > limit:
+                regressions.append(
+                    f"{units} units: {key} {result[key]:.2f} > {limit:.2f} "
+                    f"(baseline {expected:.2f})"
+                )
+    return regressions
+
+
+def main() -> None:
+    """Parse the arguments, run the benchmark and compare with the baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--units", type=int, nargs="+", default=list(DEFAULT_UNITS), help="fleet sizes"
+    )
+    parser.add_argument("--cycles", type=int, default=5, help="update cycles per fleet size")
+    parser.add_argument(
+        "--change-rate",
+        type=float,
+        default=0.1,
+        help="chance that a measurement changes between two polls",
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=2.0, help="allowed factor over the baseline"
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--check", action="store_true", help="fail on regressions")
+    group.add_argument(
+        "--update-baseline", action="store_true", help="store the results as the baseline"
+    )
+    args = parser.parse_args()
+
+    results = run(async_benchmark(args))
+
+    if args.update_baseline:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        baseline.update(
+            {
+                units: {key: round(result[key], 3) for key in checked_results(result)}
+                for units, result in results.items()
+            }
+        )
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Updated {args.baseline}")
+    elif args.check:
+        if not args.baseline.exists():
+            sys.exit(f"No baseline at {args.baseline}, record one with --update-baseline")
+        regressions = check_regressions(
+            results, json.loads(args.baseline.read_text()), args.tolerance
+        )
+        if regressions:
+            print("Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""End-to-end poll benchmark of MeltemCoordinator against the replay stub.
+
+Run from the repository root:
+
+    python benchmarks/bench_poll.py [--cycles N] [--latency] [--command-every N]
+
+Every cycle moves the loop clock forward by the longest poll interval, so
+each device is due, and runs one coordinator refresh against responses
+replayed from test-data. Reports the cycle latency, the requests per cycle
+and, in a second pass with tracemalloc, the memory allocated per cycle.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+import tracemalloc
+
+from common import run, summarize
+from replay import ReplayServer
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.meltem.api import MeltemApiClient
+from custom_components.meltem.const import POLL_INTERVAL_MAX, VENTILATION_MANUAL_MIN
+from custom_components.meltem.coordinator import MeltemCoordinator
+
+
+async def _async_cycle(
+    coordinator: MeltemCoordinator,
+    cycle: int,
+    command_every: int,
+) -> None:
+    """Run one update cycle, preceded by a command every command_every cycles."""
+    asyncio.get_running_loop().advance(POLL_INTERVAL_MAX)
+    if command_every and cycle % command_every == 0:
+        device_id = next(iter(coordinator.data.devices))
+        await coordinator.async_set_manual_speed(
+            device_id, VENTILATION_MANUAL_MIN + cycle % 90
+        )
+    await coordinator.async_refresh()
+
+
+async def async_benchmark(args: argparse.Namespace) -> dict:
+    """Run the benchmark and return the results."""
+    server = ReplayServer(replay_latency=args.latency, latency_scale=args.latency_scale)
+    url = await server.start()
+    hass = HomeAssistant(tempfile.mkdtemp())
+    client = MeltemApiClient("user", "password", host=url)
+    coordinator = MeltemCoordinator(hass, client)
+
+    try:
+        start = time.perf_counter()
+        await coordinator.async_refresh()
+        if not coordinator.last_update_success:
+            raise RuntimeError(f"First refresh failed: {coordinator.last_exception}")
+        first_refresh = time.perf_counter() - start
+
+        latencies = []
+        requests_before = sum(server.requests.values())
+        for cycle in range(args.cycles):
+            start = time.perf_counter()
+            await _async_cycle(coordinator, cycle, args.command_every)
+            latencies.append(time.perf_counter() - start)
+        requests = sum(server.requests.values()) - requests_before
+
+        tracemalloc.start()
+        allocated = []
+        retained_before = tracemalloc.get_traced_memory()[0]
+        for cycle in range(args.allocation_cycles):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            await _async_cycle(coordinator, cycle, args.command_every)
+            allocated.append(tracemalloc.get_traced_memory()[1] - before)
+        retained = tracemalloc.get_traced_memory()[0] - retained_before
+        tracemalloc.stop()
+    finally:
+        await coordinator.async_close()
+        await server.stop()
+
+    return {
+        "devices": len(coordinator.data.devices) if coordinator.data else 0,
+        "first_refresh_ms": first_refresh * 1000,
+        "cycle_ms": {key: value * 1000 for key, value in summarize(latencies).items()},
+        "requests_per_cycle": requests / args.cycles,
+        "requests": dict(server.requests),
+        "peak_allocated_kib_per_cycle": summarize(allocated)["mean"] / 1024,
+        "retained_kib": retained / 1024,
+        "metrics": client.metrics.as_dict(),
+    }
+
+
+def main() -> None:
+    """Parse the arguments, run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=200, help="timed update cycles")
+    parser.add_argument(
+        "--allocation-cycles", type=int, default=50, help="update cycles traced with tracemalloc"
+    )
+    parser.add_argument(
+        "--latency", action="store_true", help="replay the recorded response latency"
+    )
+    parser.add_argument(
+        "--latency-scale", type=float, default=1.0, help="factor for the recorded latency"
+    )
+    parser.add_argument(
+        "--command-every", type=int, default=0, help="send a speed command every N cycles"
+    )
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    results = run(async_benchmark(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    cycle = results["cycle_ms"]
+    print(f"devices:             {results['devices']}")
+    print(f"first refresh:       {results['first_refresh_ms']:.1f} ms")
+    print(
+        f"cycle latency:       mean {cycle['mean']:.2f} ms, p50 {cycle['p50']:.2f} ms, "
+        f"p95 {cycle['p95']:.2f} ms, max {cycle['max']:.2f} ms"
+    )
+    print(f"requests per cycle:  {results['requests_per_cycle']:.2f}")
+    print(f"requests:            {results['requests']}")
+    print(f"allocated per cycle: {results['peak_allocated_kib_per_cycle']:.1f} KiB peak")
+    print(f"retained:            {results['retained_kib']:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Shared helpers for the benchmarks."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Coroutine
+from functools import partial
+import importlib
+from pathlib import Path
+import statistics
+import sys
+from typing import Any, TypeVar
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# pylint: disable=wrong-import-position
+from homeassistant import config_entries, loader
+from homeassistant.core import CoreState, HomeAssistant
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity,
+    entity_registry as er,
+    issue_registry as ir,
+)
+
+from custom_components.meltem.api import MeltemApiClient
+from custom_components.meltem.const import (
+    DOMAIN,
+    CONF_PASSWORD,
+    CONF_SESSION_ID,
+    CONF_USERNAME,
+)
+
+_T = TypeVar("_T")
+
+
+class FastForwardEventLoop(asyncio.SelectorEventLoop):
+    """Event loop whose clock can be moved forward.
+
+    Moving the clock makes the coordinator consider devices and register
+    tiers due without waiting for their poll intervals in real time.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the loop."""
+        super().__init__()
+        self.offset = 0.0
+
+    def time(self) -> float:
+        """Return the loop time including the offset."""
+        return super().time() + self.offset
+
+    def advance(self, seconds: float) -> None:
+        """Move the clock forward."""
+        self.offset += seconds
+
+
+def run(main: Coroutine[Any, Any, _T]) -> _T:
+    """Run a benchmark on a FastForwardEventLoop."""
+    with asyncio.Runner(loop_factory=FastForwardEventLoop) as runner:
+        return runner.run(main)
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    """Return the mean, median, 95th percentile and maximum of some values."""
+    ordered = sorted(values)
+    return {
+        "mean": statistics.fmean(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+    }
+
+
+async def async_setup_hass(config_dir: str) -> HomeAssistant:
+    """Return a running Home Assistant instance that loads the integration from this repository."""
+    custom_components = Path(config_dir) / "custom_components"
+    if not custom_components.exists():
+        custom_components.symlink_to(ROOT / "custom_components")
+
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    entity.async_setup(hass)
+    loader.async_setup(hass)
+    await ar.async_load(hass)
+    await dr.async_load(hass)
+    await er.async_load(hass)
+    await ir.async_load(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    hass.state = CoreState.running
+    return hass
+
+
+def patch_api_host(url: str) -> None:
+    """Point the API clients created by the integration at a local server."""
+    integration = importlib.import_module("custom_components.meltem")
+    integration.MeltemApiClient = partial(MeltemApiClient, host=url)
+
+
+async def async_add_entry(hass: HomeAssistant) -> config_entries.ConfigEntry:
+    """Add a Meltem config entry and wait until it is set up.
+
+    Polling is disabled for the entry, the benchmarks run the update cycles.
+    """
+    entry = config_entries.ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title="Benchmark",
+        data={CONF_USERNAME: "user", CONF_PASSWORD: "password", CONF_SESSION_ID: None},
+        source=config_entries.SOURCE_USER,
+        pref_disable_polling=True,
+    )
+    await hass.config_entries.async_add(entry)
+    await hass.async_block_till_done()
+    return entry
+
+
+class VirtualClockEventLoop(asyncio.SelectorEventLoop):
+    """Event loop that skips idle time instead of waiting for it.
+
+    Whenever no callback is ready, the clock jumps to the next scheduled
+    timer, so sleeps, timeouts and poll intervals take no real time. Only
+    suitable for code that does not wait for real sockets or threads.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the loop at virtual time 0."""
+        super().__init__()
+        self._virtual_time = 0.0
+
+    def time(self) -> float:
+        """Return the virtual time."""
+        return self._virtual_time
+
+    def _run_once(self) -> None:
+        """Jump to the next timer if nothing is ready, then run one iteration."""
+        # pylint: disable=protected-access
+        if not self._ready and self._scheduled:
+            self._virtual_time = max(self._virtual_time, self._scheduled[0]._when)
+        super()._run_once()
+
+
+def run_virtual(main: Coroutine[Any, Any, _T]) -> _T:
+    """Run a benchmark on a VirtualClockEventLoop."""
+    with asyncio.Runner(loop_factory=VirtualClockEventLoop) as runner:
+        return runner.run(main)
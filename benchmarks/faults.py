@@ -0,0 +1,265 @@
+"""Fault-injecting stand-in for the connect2myhome API.
+
+FaultInjectingSession implements the part of aiohttp.ClientSession that
+MeltemApiClient uses and answers requests in process, for a synthetic fleet.
+It injects per-endpoint latency, session expiry, bursts of 5xx responses or
+timeouts and partial live data responses, all driven by the loop clock so
+scenarios can run on a VirtualClockEventLoop.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+import json
+import random
+from typing import Any
+from urllib.parse import urlsplit
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+import common  # noqa: F401  # Puts the repository on sys.path
+from fleet import Fleet
+
+from custom_components.meltem.const import (
+    API_AUTH_ENDPOINT,
+    API_BRIDGE_DEVICES_ENDPOINT,
+    API_BRIDGES_ENDPOINT,
+    API_LIVE_DATA_ENDPOINT,
+    API_SET_DATA_ENDPOINT,
+    LIVE_DATA_ERROR_STATUS,
+    LIVE_DATA_NAN,
+)
+
+# Longer than any client timeout, for requests that never get an answer
+HANG = 3600.0
+
+
+@dataclass(frozen=True)
+class Latency:
+    """Log-normal latency distribution of an endpoint, in seconds."""
+
+    median: float
+    sigma: float = 0.3
+
+    def sample(self, rng: random.Random) -> float:
+        """Return a latency."""
+        return self.median * rng.lognormvariate(0, self.sigma)
+
+
+@dataclass(frozen=True)
+class Burst:
+    """A period in which requests fail.
+
+    kind is an HTTP status such as 503, or "timeout" for requests that are
+    never answered. endpoints limits the burst to some endpoints.
+    """
+
+    start: float
+    duration: float
+    kind: int | str = 503
+    endpoints: frozenset[str] | None = None
+
+    @property
+    def end(self) -> float:
+        """Return the time the burst ends."""
+        return self.start + self.duration
+
+    def affects(self, endpoint: str, now: float) -> bool:
+        """Return True if a request to endpoint at time now fails."""
+        return self.start <= now < self.end and (
+            self.endpoints is None or endpoint in self.endpoints
+        )
+
+
+@dataclass
+class FaultPlan:
+    """Faults to inject, with times relative to the start of the scenario."""
+
+    latency: dict[str, Latency] = field(default_factory=dict)
+    default_latency: Latency = Latency(0.2)
+    # Sessions are rejected after this many seconds, None keeps them valid
+    session_lifetime: float | None = None
+    # Times at which all issued sessions are invalidated
+    session_expiries: tuple[float, ...] = ()
+    bursts: tuple[Burst, ...] = ()
+    # Chance that a register of a live data response is reported with status 1001 or as NaN
+    partial_rate: float = 0.0
+
+
+@dataclass(frozen=True)
+class RequestRecord:
+    """A request received by the stand-in."""
+
+    time: float
+    endpoint: str
+    outcome: str  # HTTP status or "timeout"
+
+
+class FakeResponse:
+    """Response of the stand-in."""
+
+    def __init__(self, method: str, url: str, status: int, body: bytes) -> None:
+        """Initialize the response."""
+        self.status = status
+        self._body = body
+        self._request_info = aiohttp.RequestInfo(
+            URL(url), method, CIMultiDictProxy(CIMultiDict()), URL(url)
+        )
+
+    def raise_for_status(self) -> None:
+        """Raise ClientResponseError for error statuses, like aiohttp."""
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(
+                self._request_info, (), status=self.status, message="Injected fault"
+            )
+
+    async def read(self) -> bytes:
+        """Return the body."""
+        return self._body
+
+
+class _RequestContext:
+    """Async context manager returned by FaultInjectingSession.request()."""
+
+    def __init__(self, session: FaultInjectingSession, method: str, url: str, kwargs: dict) -> None:
+        self._session = session
+        self._method = method
+        self._url = url
+        self._kwargs = kwargs
+
+    async def __aenter__(self) -> FakeResponse:
+        return await self._session.handle(self._method, self._url, self._kwargs)
+
+    async def __aexit__(self, *args: Any) -> None:
+        return None
+
+
+class FaultInjectingSession:
+    """Stand-in for the aiohttp session of MeltemApiClient."""
+
+    def __init__(self, fleet: Fleet, plan: FaultPlan, seed: int = 0) -> None:
+        """Initialize the stand-in. Scenario times count from the first request."""
+        self.fleet = fleet
+        self.plan = plan
+        self.records: list[RequestRecord] = []
+        self.closed = False
+        self._rng = random.Random(seed)
+        self._start: float | None = None
+        self._sessions: dict[str, float] = {}
+        self._expiries = list(plan.session_expiries)
+        self._session_counter = 0
+
+    @property
+    def requests(self) -> Counter[str]:
+        """Return the number of requests by endpoint."""
+        return Counter(record.endpoint for record in self.records)
+
+    def now(self) -> float:
+        """Return the scenario time."""
+        loop_time = asyncio.get_running_loop().time()
+        if self._start is None:
+            self._start = loop_time
+        return loop_time - self._start
+
+    def request(self, method: str, url: str, **kwargs: Any) -> _RequestContext:
+        """Start a request."""
+        return _RequestContext(self, method, url, kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> _RequestContext:
+        """Start a POST request."""
+        return _RequestContext(self, "POST", url, kwargs)
+
+    async def close(self) -> None:
+        """Close the session."""
+        self.closed = True
+
+    async def handle(self, method: str, url: str, kwargs: dict) -> FakeResponse:
+        """Answer a request after its latency, or fail it as planned."""
+        endpoint = urlsplit(url).path
+        params = {**kwargs.get("params", {}), **kwargs.get("data", {})}
+        now = self.now()
+        latency = self.plan.latency.get(endpoint, self.plan.default_latency)
+
+        for burst in self.plan.bursts:
+            if burst.affects(endpoint, now):
+                if burst.kind == "timeout":
+                    self.records.append(RequestRecord(now, endpoint, "timeout"))
+                    await asyncio.sleep(HANG)
+                await asyncio.sleep(latency.sample(self._rng))
+                self.records.append(RequestRecord(now, endpoint, str(burst.kind)))
+                return FakeResponse(method, url, int(burst.kind), b"")
+
+        await asyncio.sleep(latency.sample(self._rng))
+        status, body = self._answer(endpoint, params, self.now())
+        self.records.append(RequestRecord(now, endpoint, str(status)))
+        return FakeResponse(method, url, status, json.dumps(body).encode())
+
+    def _session_valid(self, session_id: str | None, now: float) -> bool:
+        """Return True if a session ID is still accepted."""
+        while self._expiries and self._expiries[0] <= now:
+            self._expiries.pop(0)
+            self._sessions.clear()
+        issued = self._sessions.get(session_id or "")
+        if issued is None:
+            return False
+        lifetime = self.plan.session_lifetime
+        return lifetime is None or now - issued < lifetime
+
+    def _answer(self, endpoint: str, params: dict, now: float) -> tuple[int, Any]:
+        """Return the status and body for a request."""
+        if endpoint == API_AUTH_ENDPOINT:
+            self._session_counter += 1
+            session_id = f"session-{self._session_counter}"
+            self._sessions[session_id] = now
+            return 200, {"sessionId": session_id}
+
+        if not self._session_valid(params.get("sessionId"), now):
+            return 401, {}
+
+        if endpoint == API_BRIDGES_ENDPOINT:
+            return 200, {
+                "bridges": [
+                    {"bridgeId": bridge_id, "name": name}
+                    for bridge_id, name in self.fleet.bridges.items()
+                ]
+            }
+        if endpoint == API_BRIDGE_DEVICES_ENDPOINT:
+            return 200, {
+                "devices": [
+                    {"deviceId": device.device_id, "productId": "0001c853", "name": device.name}
+                    for device in self.fleet.devices.values()
+                    if device.bridge_id == params.get("bridgeId")
+                ]
+            }
+        if endpoint == API_LIVE_DATA_ENDPOINT:
+            device = self.fleet.devices.get(params.get("deviceId", ""))
+            if device is None:
+                return 404, {}
+            return 200, {"data": self._live_data(device, params.get("registers", ""))}
+        if endpoint == API_SET_DATA_ENDPOINT:
+            return 200, {"statusId": f"status-{len(self.records)}"}
+        return 404, {}
+
+    def _live_data(self, device: Any, registers: str) -> list[dict[str, Any]]:
+        """Return live data items, some of them replaced by errors as planned."""
+        items = []
+        for register in map(int, registers.split(",")):
+            if register not in device.registers:
+                items.append({"address": register, "status": LIVE_DATA_ERROR_STATUS})
+            elif self._rng.random() < self.plan.partial_rate:
+                if self._rng.random() < 0.5:
+                    items.append({"address": register, "status": LIVE_DATA_ERROR_STATUS})
+                else:
+                    items.append({"address": register, "value": LIVE_DATA_NAN})
+            else:
+                items.append(
+                    {
+                        "address": register,
+                        "value": device.registers[register],
+                        "lastUpdate": device.last_update[register],
+                    }
+                )
+        return items
@@ -0,0 +1,235 @@
+"""Synthetic fleet of ventilation units behind a stub of the connect2myhome API.
+
+generate_fleet() models bridges with devices and plausible values for every
+register in REGISTER_DEFINITIONS and ADDITIONAL_REGISTERS. FleetServer
+serves the fleet and lets a share of the measurements drift on every live
+data request, so update cycles see a realistic number of changes.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+import json
+import math
+import random
+import time
+from typing import Any
+
+from aiohttp import web
+
+import common  # noqa: F401  # Puts the repository on sys.path
+
+from custom_components.meltem.const import (
+    ADDITIONAL_REGISTERS,
+    API_AUTH_ENDPOINT,
+    API_BRIDGE_DEVICES_ENDPOINT,
+    API_BRIDGES_ENDPOINT,
+    API_LIVE_DATA_ENDPOINT,
+    API_SET_DATA_ENDPOINT,
+    REGISTER_DEFINITIONS,
+    VENTILATION_MANUAL_REGISTER,
+    VENTILATION_REGISTER,
+    VENTILATION_SPEED_REGISTER,
+    VENTILATION_STATUS_REGISTER,
+)
+
+DEVICES_PER_BRIDGE = 8
+
+ALL_DEFINITIONS = {**REGISTER_DEFINITIONS, **ADDITIONAL_REGISTERS}
+
+# Value ranges by device class or unit of the register definition
+VALUE_RANGES: dict[str, tuple[float, float]] = {
+    "temperature": (12.0, 24.0),
+    "humidity": (30.0, 65.0),
+    "carbon_dioxide": (420.0, 1400.0),
+    "volatile_organic_compounds": (1.0, 40.0),
+    "m³/h": (10.0, 100.0),
+    "%": (0.0, 41385.0),
+    "d": (0.0, 365.0),
+    "h": (100.0, 40000.0),
+}
+
+
+def _register_value(rng: random.Random, register: int, info: dict[str, Any]) -> Any:
+    """Return a plausible value for a register."""
+    if "value_map" in info:
+        return rng.choice(list(info["value_map"]))
+    value_range = VALUE_RANGES.get(info.get("device_class") or "") or VALUE_RANGES.get(
+        info.get("unit") or ""
+    )
+    if value_range is None:
+        return rng.randint(0, 255)
+    low, high = value_range
+    if info.get("device_class") in ("temperature", "humidity"):
+        return round(rng.uniform(low, high), 2)
+    return int(rng.uniform(low, high))
+
+
+@dataclass
+class SyntheticDevice:
+    """A ventilation unit and its register values."""
+
+    device_id: str
+    bridge_id: str
+    name: str
+    registers: dict[int, Any]
+    last_update: dict[int, int] = field(default_factory=dict)
+
+
+@dataclass
+class Fleet:
+    """Bridges and devices of a synthetic account."""
+
+    bridges: dict[str, str]
+    devices: dict[str, SyntheticDevice]
+
+
+def generate_fleet(units: int, seed: int = 0) -> Fleet:
+    """Return a fleet of the given number of ventilation units."""
+    rng = random.Random(seed)
+    now = int(time.time() * 1000)
+    bridges = {
+        f"bridge-{index:04d}": f"Building {index + 1}"
+        for index in range(math.ceil(units / DEVICES_PER_BRIDGE))
+    }
+    bridge_ids = list(bridges)
+    devices = {}
+    for index in range(units):
+        device_id = f"{index:064x}"
+        registers = {
+            register: _register_value(rng, register, info)
+            for register, info in ALL_DEFINITIONS.items()
+        }
+        devices[device_id] = SyntheticDevice(
+            device_id=device_id,
+            bridge_id=bridge_ids[index // DEVICES_PER_BRIDGE],
+            name=f"Unit {index + 1}",
+            registers=registers,
+            last_update={register: now for register in registers},
+        )
+    return Fleet(bridges, devices)
+
+
+class FleetServer:
+    """aiohttp server answering API requests for a synthetic fleet."""
+
+    def __init__(self, fleet: Fleet, change_rate: float = 0.1, seed: int = 0) -> None:
+        """Initialize the server.
+
+        change_rate is the chance that a measurement changes between two
+        live data requests for the same device.
+        """
+        self.fleet = fleet
+        self.change_rate = change_rate
+        self.requests: Counter[str] = Counter()
+        self._rng = random.Random(seed)
+        self._runner: web.AppRunner | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL."""
+        app = web.Application()
+        app.router.add_post(API_AUTH_ENDPOINT, self._auth)
+        app.router.add_get(API_BRIDGES_ENDPOINT, self._bridges)
+        app.router.add_get(API_BRIDGE_DEVICES_ENDPOINT, self._devices)
+        app.router.add_get(API_LIVE_DATA_ENDPOINT, self._live)
+        app.router.add_post(API_SET_DATA_ENDPOINT, self._set)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        sockets = site._server.sockets  # pylint: disable=protected-access
+        return f"http://{host}:{sockets[0].getsockname()[1]}"
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner:
+            await self._runner.cleanup()
+
+    @staticmethod
+    def _json(data: Any) -> web.Response:
+        return web.Response(body=json.dumps(data).encode(), content_type="application/json")
+
+    async def _auth(self, request: web.Request) -> web.Response:
+        self.requests[request.path] += 1
+        return self._json({"sessionId": "synthetic-session"})
+
+    async def _bridges(self, request: web.Request) -> web.Response:
+        self.requests[request.path] += 1
+        return self._json(
+            {
+                "bridges": [
+                    {"bridgeId": bridge_id, "name": name}
+                    for bridge_id, name in self.fleet.bridges.items()
+                ]
+            }
+        )
+
+    async def _devices(self, request: web.Request) -> web.Response:
+        self.requests[request.path] += 1
+        bridge_id = request.query.get("bridgeId")
+        return self._json(
+            {
+                "devices": [
+                    {
+                        "deviceId": device.device_id,
+                        "productId": "0001c853",
+                        "zoneId": "default",
+                        "name": device.name,
+                    }
+                    for device in self.fleet.devices.values()
+                    if device.bridge_id == bridge_id
+                ]
+            }
+        )
+
+    async def _live(self, request: web.Request) -> web.Response:
+        self.requests[request.path] += 1
+        device = self.fleet.devices.get(request.query.get("deviceId", ""))
+        if device is None:
+            raise web.HTTPNotFound()
+        now = int(time.time() * 1000)
+        data = []
+        for register in map(int, request.query.get("registers", "").split(",")):
+            if register not in device.registers:
+                data.append({"address": register, "status": 1001})
+                continue
+            self._drift(device, register, now)
+            data.append(
+                {
+                    "address": register,
+                    "value": device.registers[register],
+                    "lastUpdate": device.last_update[register],
+                }
+            )
+        return self._json({"data": data})
+
+    def _drift(self, device: SyntheticDevice, register: int, now: int) -> None:
+        """Change a measurement by a small amount, with the configured probability."""
+        info = ALL_DEFINITIONS[register]
+        if info.get("state_class") != "measurement" or self._rng.random() >= self.change_rate:
+            return
+        value = device.registers[register]
+        if isinstance(value, float):
+            device.registers[register] = round(value + self._rng.uniform(-0.5, 0.5), 2)
+        else:
+            device.registers[register] = max(0, value + self._rng.choice((-1, 1)))
+        device.last_update[register] = now
+
+    async def _set(self, request: web.Request) -> web.Response:
+        self.requests[request.path] += 1
+        form = await request.post()
+        device = self.fleet.devices.get(str(form.get("deviceId")))
+        if device is None:
+            raise web.HTTPNotFound()
+        register = int(str(form.get("register")))
+        values = [int(value) for value in str(form.get("values", "")).split(",") if value]
+        now = int(time.time() * 1000)
+        if register == VENTILATION_REGISTER and len(values) > 1:
+            # Values are the operation mode followed by the ventilation level
+            device.registers[VENTILATION_STATUS_REGISTER] = values[1]
+        elif register == VENTILATION_MANUAL_REGISTER and values:
+            device.registers[VENTILATION_STATUS_REGISTER] = 112
+            device.registers[VENTILATION_SPEED_REGISTER] = values[0]
+            device.last_update[VENTILATION_SPEED_REGISTER] = now
+        device.last_update[VENTILATION_STATUS_REGISTER] = now
+        return self._json({"statusId": "synthetic-status"})
@@ -0,0 +1,214 @@
+"""Replay stub of the connect2myhome API built from the captures in test-data.
+
+The captures are Charles session exports: lists of requests with their
+method, path, query, response body and timings. Every request to the stub is
+answered with the next recorded response for the same method and path,
+preferring responses recorded for the same deviceId.
+
+test-data/set and test-data/set-manual hold the live data bodies recorded
+after each level and manual speed command. Once a device was sent one of
+these commands, its live data requests are answered with the matching body,
+so polls after a command see its effect.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, defaultdict
+import json
+from pathlib import Path
+import time
+from typing import NamedTuple
+from urllib.parse import parse_qs
+
+from aiohttp import web
+
+import common  # noqa: F401  # Puts the repository on sys.path
+
+from custom_components.meltem.const import (
+    API_LIVE_DATA_ENDPOINT,
+    API_SET_DATA_ENDPOINT,
+    VENTILATION_LEVELS,
+    VENTILATION_MANUAL_REGISTER,
+    VENTILATION_REGISTER,
+    calculate_manual_value,
+)
+
+TEST_DATA = Path(__file__).resolve().parent.parent / "test-data"
+
+CAPTURE_FILES = (
+    "meltem-session.json",
+    "bridge.json",
+    "live.json",
+    "off.json",
+    "set.json",
+    "set-and-status.json",
+    "set-manual.json",
+)
+
+# Live data bodies recorded after a level command, by file and level
+LEVEL_CAPTURES = {
+    "set/off.json": "off",
+    "set/low.json": "low",
+    "set/med.json": "medium",
+    "set/high.json": "high",
+}
+# Live data bodies recorded after a manual speed command, by file and percentage
+MANUAL_SPEED_CAPTURES = {
+    "set-manual/10.json": 10,
+    "set-manual/60.json": 60,
+    "set-manual/100.json": 100,
+}
+
+
+class Capture(NamedTuple):
+    """A recorded response."""
+
+    status: int
+    body: bytes
+    latency: float  # seconds until the first response byte was received
+    device_id: str | None
+
+
+def load_captures(root: Path = TEST_DATA) -> dict[tuple[str, str], list[Capture]]:
+    """Return the recorded responses by method and path."""
+    captures: dict[tuple[str, str], list[Capture]] = defaultdict(list)
+    for name in CAPTURE_FILES:
+        for entry in json.loads((root / name).read_text()):
+            response = entry.get("response", {})
+            text = response.get("body", {}).get("text")
+            if entry.get("status") != "COMPLETE" or text is None:
+                continue
+            query = parse_qs(entry.get("query") or "")
+            if entry["method"] == "POST":
+                query.update(parse_qs(entry["request"].get("body", {}).get("text", "")))
+            captures[(entry["method"], entry["path"])].append(
+                Capture(
+                    status=response["status"],
+                    body=text.encode(),
+                    latency=(entry.get("durations", {}).get("latency") or 0) / 1000,
+                    device_id=query.get("deviceId", [None])[0],
+                )
+            )
+    return dict(captures)
+
+
+def load_command_captures(root: Path = TEST_DATA) -> dict[tuple[int, tuple[int, ...]], bytes]:
+    """Return the live data bodies recorded after commands, by register and written values."""
+    captures = {}
+    for name, level in LEVEL_CAPTURES.items():
+        key = (VENTILATION_REGISTER, tuple(VENTILATION_LEVELS[level]))
+        captures[key] = (root / name).read_bytes()
+    for name, percentage in MANUAL_SPEED_CAPTURES.items():
+        key = (VENTILATION_MANUAL_REGISTER, (calculate_manual_value(percentage),))
+        captures[key] = (root / name).read_bytes()
+    return captures
+
+
+def _restamp(body: bytes) -> bytes:
+    """Return a live data body with every sample stamped with the current time.
+
+    The bodies were recorded in some order, their own timestamps would make a
+    later command's samples look older than the ones they replace.
+    """
+    data = json.loads(body)
+    now = int(time.time() * 1000)
+    for item in data.get("data", ()):
+        if "lastUpdate" in item:
+            item["lastUpdate"] = now
+    return json.dumps(data).encode()
+
+
+class ReplayServer:
+    """aiohttp server answering API requests with recorded responses."""
+
+    def __init__(
+        self,
+        captures: dict[tuple[str, str], list[Capture]] | None = None,
+        replay_latency: bool = False,
+        latency_scale: float = 1.0,
+        command_captures: dict[tuple[int, tuple[int, ...]], bytes] | None = None,
+    ) -> None:
+        """Initialize the server."""
+        self.captures = captures if captures is not None else load_captures()
+        self.command_captures = (
+            command_captures if command_captures is not None else load_command_captures()
+        )
+        # Live data body of each device since its last recognized command
+        self._device_states: dict[str, bytes] = {}
+        self.replay_latency = replay_latency
+        self.latency_scale = latency_scale
+        self.requests: Counter[str] = Counter()
+        self._positions: Counter[tuple[str, str, str | None]] = Counter()
+        self._runner: web.AppRunner | None = None
+        self.url: str | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL."""
+        app = web.Application()
+        for method, path in self.captures:
+            app.router.add_route(method, path, self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        sockets = site._server.sockets  # pylint: disable=protected-access
+        self.url = f"http://{host}:{sockets[0].getsockname()[1]}"
+        return self.url
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner:
+            await self._runner.cleanup()
+
+    def next_capture(self, method: str, path: str, device_id: str | None) -> Capture:
+        """Return the next recorded response, cycling through the recordings."""
+        captures = self.captures[(method, path)]
+        matching = [capture for capture in captures if capture.device_id == device_id]
+        if matching:
+            captures = matching
+        else:
+            device_id = None
+        key = (method, path, device_id)
+        capture = captures[self._positions[key] % len(captures)]
+        self._positions[key] += 1
+        return capture
+
+    def command_capture(self, register: int, values: tuple[int, ...]) -> bytes | None:
+        """Return the live data body recorded after a command, or None.
+
+        Manual speeds are matched to the recorded speed closest to them.
+        """
+        if register == VENTILATION_MANUAL_REGISTER:
+            recorded = [key for key in self.command_captures if key[0] == register]
+            if not recorded or len(values) != 1:
+                return None
+            return self.command_captures[
+                min(recorded, key=lambda key: abs(key[1][0] - values[0]))
+            ]
+        return self.command_captures.get((register, values))
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Answer a request with the next recorded response."""
+        self.requests[request.path] += 1
+        params = dict(request.query)
+        if request.method == "POST":
+            params.update(await request.post())
+        device_id = params.get("deviceId")
+        capture = self.next_capture(request.method, request.path, device_id)
+        body = capture.body
+
+        if request.path == API_SET_DATA_ENDPOINT and device_id and capture.status == 200:
+            values = tuple(int(value) for value in params.get("values", "").split(",") if value)
+            state = self.command_capture(int(params.get("register", 0)), values)
+            if state is not None:
+                self._device_states[device_id] = _restamp(state)
+        elif request.path == API_LIVE_DATA_ENDPOINT and device_id in self._device_states:
+            body = self._device_states[device_id]
+
+        if self.replay_latency and capture.latency:
+            await asyncio.sleep(capture.latency * self.latency_scale)
+        return web.Response(
+            status=capture.status,
+            body=body,
+            content_type="application/json",
+        )
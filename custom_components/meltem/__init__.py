@@ -3,43 +3,119 @@ from __future__ import annotations
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.storage import Store
 
-from .const import DOMAIN, CONF_SESSION_ID
+from .api import MeltemApiClient
+from .const import (
+    DOMAIN,
+    CONF_SESSION_ID,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+)
 from .coordinator import MeltemCoordinator
 from .device import async_setup_devices
+from .services import async_setup_services, async_unload_services
+from .session import async_acquire_session, async_release_session
 
 PLATFORMS = [Platform.SENSOR, Platform.SELECT, Platform.NUMBER, Platform.SWITCH]
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Meltem from a config entry."""
-    coordinator = MeltemCoordinator(
-        hass,
+    @callback
+    def _async_save_session_id(session_id: str) -> None:
+        """Persist a refreshed session ID so restarts do not start with a stale one."""
+        hass.config_entries.async_update_entry(
+            entry,
+            data={**entry.data, CONF_SESSION_ID: session_id},
+        )
+
+    client = MeltemApiClient(
         username=entry.data[CONF_USERNAME],
         password=entry.data[CONF_PASSWORD],
         session_id=entry.data[CONF_SESSION_ID],
+        on_session_refresh=_async_save_session_id,
+        session=async_acquire_session(hass),
     )
+    coordinator = MeltemCoordinator(
+        hass,
+        client,
+        entry.options.get(CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS),
+    )
+
+    # Release the shared session if setup fails anywhere, a failed setup is not unloaded
+    try:
+        await _async_setup_coordinator(hass, entry, coordinator)
+    except BaseException:
+        hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
+        await coordinator.async_close()
+        await async_release_session(hass)
+        raise
+
+    async_setup_services(hass)
+    return True
 
-    # Get initial data
-    await coordinator.async_config_entry_first_refresh()
+async def _async_setup_coordinator(
+    hass: HomeAssistant, entry: ConfigEntry, coordinator: MeltemCoordinator
+) -> None:
+    """Load the first data of a coordinator and set up its devices and platforms."""
+    # Start from the last known data if there is any, otherwise wait for the API
+    restored = await coordinator.async_restore()
+    if not restored:
+        await coordinator.async_config_entry_first_refresh()
 
     # Set up devices in registry
     async_setup_devices(
         hass,
         entry.entry_id,
-        coordinator.data["bridges"],
-        coordinator.data["devices"],
+        coordinator.data.bridges,
+        coordinator.data.devices,
     )
 
     # Store coordinator for platforms to access
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
 
+    # The platforms create entities for the current data, later devices and registers are announced
+    coordinator.async_enable_discovery()
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    return True
+
+    # Only request registers that back enabled entities
+    coordinator.async_update_enabled_registers()
+    entry.async_on_unload(
+        hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED,
+            coordinator.async_handle_entity_registry_updated,
+        )
+    )
+
+    # Apply changed options by reloading the entry, refreshed session IDs update it too
+    options = dict(entry.options)
+
+    async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Reload the config entry when its options change."""
+        if entry.options != options:
+            await hass.config_entries.async_reload(entry.entry_id)
+
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
+    if restored:
+        # Entities show the restored values as stale until this refresh succeeds
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh"
+        )
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         coordinator = hass.data[DOMAIN].pop(entry.entry_id)
         await coordinator.async_close()
-    return unload_ok
\ No newline at end of file
+        await async_release_session(hass)
+        async_unload_services(hass)
+    return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the last known data of a removed config entry."""
+    await Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}.{entry.entry_id}").async_remove()
@@ -0,0 +1,468 @@
+"""API client for the Meltem cloud."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import logging
+import random
+from typing import Any, TypeVar
+
+import aiohttp
+import async_timeout
+
+from homeassistant.util.json import json_loads
+
+from .const import (
+    API_HOST,
+    API_KEY,
+    API_AUTH_ENDPOINT,
+    API_BRIDGES_ENDPOINT,
+    API_BRIDGE_DEVICES_ENDPOINT,
+    API_LIVE_DATA_ENDPOINT,
+    API_SET_DATA_ENDPOINT,
+    API_TIMEOUT,
+    API_CONNECTION_LIMIT,
+    API_DNS_CACHE_TTL,
+    API_KEEPALIVE_TIMEOUT,
+    USER_AGENT,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    RETRY_DEADLINE,
+    RETRY_MAX_ATTEMPTS,
+    SESSION_REFRESH_MARGIN,
+    SESSION_LIFETIME_SAMPLES,
+    SESSION_LIFETIME_MIN,
+    CIRCUIT_CLOSED,
+    CIRCUIT_OPEN,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    CIRCUIT_MAX_RESET_TIMEOUT,
+)
+from .metrics import MeltemMetrics
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+DEFAULT_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "*/*",
+    "Accept-Language": "en-GB,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate, br",
+}
+FORM_HEADERS = {
+    "Content-Type": "application/x-www-form-urlencoded;charset=UTF-8",
+}
+
+# HTTP statuses that indicate a transient problem worth retrying
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def create_session() -> aiohttp.ClientSession:
+    """Return an HTTP session with a connection pool tuned for the API host."""
+    connector = aiohttp.TCPConnector(
+        limit_per_host=API_CONNECTION_LIMIT,
+        ttl_dns_cache=API_DNS_CACHE_TTL,
+        keepalive_timeout=API_KEEPALIVE_TIMEOUT,
+    )
+    return aiohttp.ClientSession(connector=connector, headers=DEFAULT_HEADERS)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Stop sending requests to an API that keeps failing.
+
+    After failure_threshold consecutive failures the breaker opens and
+    rejects requests without sending them. Once reset_timeout has passed a
+    single probe request is let through (half-open): if it succeeds the
+    breaker closes, otherwise it opens again with a doubled timeout.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT,
+        max_reset_timeout: float = CIRCUIT_MAX_RESET_TIMEOUT,
+    ) -> None:
+        """Initialize the circuit breaker."""
+        self._failure_threshold = failure_threshold
+        self._base_reset_timeout = reset_timeout
+        self._max_reset_timeout = max_reset_timeout
+        self._reset_timeout = reset_timeout
+        self._opened_at = 0.0
+        self._probing = False
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+
+    @property
+    def is_closed(self) -> bool:
+        """Return True if requests are sent normally."""
+        return self.state == CIRCUIT_CLOSED
+
+    def before_request(self) -> None:
+        """Raise CircuitOpenError if a request must not be sent now."""
+        if self.state == CIRCUIT_CLOSED:
+            return
+        if (
+            self.state == CIRCUIT_OPEN
+            and asyncio.get_running_loop().time() - self._opened_at >= self._reset_timeout
+        ):
+            self.state = CIRCUIT_HALF_OPEN
+            self._probing = False
+        if self.state == CIRCUIT_HALF_OPEN and not self._probing:
+            # Let a single request through to probe the API
+            self._probing = True
+            return
+        raise CircuitOpenError("Meltem cloud API is unavailable")
+
+    def record_success(self) -> None:
+        """Record a request that reached the API."""
+        if self.state != CIRCUIT_CLOSED:
+            _LOGGER.info("Meltem cloud API is reachable again")
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self._reset_timeout = self._base_reset_timeout
+        self._probing = False
+
+    def release_probe(self) -> None:
+        """Allow a new probe after a probe request was cancelled."""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Record a request that failed because the API is unavailable."""
+        self.failures += 1
+        if self.state == CIRCUIT_HALF_OPEN:
+            self._reset_timeout = min(self._reset_timeout * 2, self._max_reset_timeout)
+        elif self.state == CIRCUIT_OPEN or self.failures < self._failure_threshold:
+            return
+        _LOGGER.warning(
+            "Meltem cloud API failed %d times in a row, pausing requests for %d seconds",
+            self.failures,
+            self._reset_timeout,
+        )
+        self.state = CIRCUIT_OPEN
+        self._opened_at = asyncio.get_running_loop().time()
+        self._probing = False
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retry transient API failures with exponential backoff and full jitter.
+
+    The delay before retry n is drawn uniformly from [0, base_delay * 2**n],
+    capped at max_delay, so clients failing at the same time do not retry in
+    lockstep. No retry is started that would end after the deadline.
+    """
+
+    base_delay: float = RETRY_BASE_DELAY
+    max_delay: float = RETRY_MAX_DELAY
+    deadline: float = RETRY_DEADLINE
+    max_attempts: int = RETRY_MAX_ATTEMPTS
+    on_retry: Callable[[], None] | None = None
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        """Return True if a request that failed with error may succeed later."""
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status in RETRYABLE_STATUSES
+        return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+    async def async_call(
+        self,
+        func: Callable[[], Awaitable[_T]],
+        description: str,
+    ) -> _T:
+        """Call func until it succeeds, fails permanently or the deadline passes."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+        attempt = 0
+
+        while True:
+            try:
+                async with async_timeout.timeout(deadline - loop.time()):
+                    return await func()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                attempt += 1
+                if not self.is_retryable(error) or attempt >= self.max_attempts:
+                    raise
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+                if loop.time() + delay >= deadline:
+                    raise
+                _LOGGER.warning(
+                    "Failed to %s (attempt %d/%d): %s. Retrying in %.1f seconds...",
+                    description,
+                    attempt,
+                    self.max_attempts,
+                    error,
+                    delay,
+                )
+                if self.on_retry:
+                    self.on_retry()
+                await asyncio.sleep(delay)
+
+
+class SessionManager:
+    """Keep the session ID of a Meltem account valid.
+
+    Re-authentication is single-flight: callers that saw the same session ID
+    expire wait for one login instead of each sending their own. The API does
+    not report session lifetimes, so the lifetime is learned from observed
+    expiries and later sessions are refreshed shortly before it ends. It is
+    the median of the last few expiries, so a single early invalidation on the
+    server does not become the lifetime, and expiries shorter than
+    SESSION_LIFETIME_MIN are ignored.
+    """
+
+    def __init__(
+        self,
+        login: Callable[[], Awaitable[str]],
+        session_id: str | None = None,
+        on_refresh: Callable[[str], None] | None = None,
+    ) -> None:
+        """Initialize the session manager."""
+        self._login = login
+        self._on_refresh = on_refresh
+        self._lock = asyncio.Lock()
+        # Loop time the current session ID was issued, None if unknown
+        self._issued_at: float | None = None
+        # Session ages at the last observed expiries, oldest first
+        self._expiries: deque[float] = deque(maxlen=SESSION_LIFETIME_SAMPLES)
+        self._lifetime: float | None = None
+        self.session_id = session_id
+
+    async def async_get(self) -> str:
+        """Return a session ID, logging in first if it is missing or about to expire."""
+        if self.session_id is None or self._expires_soon():
+            return await self.async_refresh(self.session_id)
+        return self.session_id
+
+    async def async_refresh(self, expired_session_id: str | None, rejected: bool = False) -> str:
+        """Replace an expired session ID, unless another caller already did."""
+        async with self._lock:
+            if self.session_id != expired_session_id:
+                return self.session_id
+
+            now = asyncio.get_running_loop().time()
+            if rejected and self._issued_at is not None:
+                self._learn_lifetime(now - self._issued_at)
+
+            self.session_id = await self._login()
+            self._issued_at = now
+            if self._on_refresh:
+                self._on_refresh(self.session_id)
+            return self.session_id
+
+    def _learn_lifetime(self, age: float) -> None:
+        """Update the learned lifetime with the age of a rejected session."""
+        _LOGGER.debug("Session expired after %d seconds", age)
+        if age < SESSION_LIFETIME_MIN:
+            return
+        if self._lifetime is not None and age > self._lifetime:
+            # The session outlived the learned lifetime, start learning again
+            self._expiries.clear()
+            self._lifetime = None
+        self._expiries.append(age)
+        if len(self._expiries) == self._expiries.maxlen:
+            self._lifetime = sorted(self._expiries)[len(self._expiries) // 2]
+
+    def _expires_soon(self) -> bool:
+        """Return True if the current session is close to its learned lifetime."""
+        if self._issued_at is None or self._lifetime is None:
+            return False
+        age = asyncio.get_running_loop().time() - self._issued_at
+        return age >= self._lifetime * SESSION_REFRESH_MARGIN
+
+
+class MeltemApiClient:
+    """Client for the connect2myhome cloud API.
+
+    All requests go through one pooled session so polls and commands reuse
+    kept-alive connections and TLS sessions, and through one request path
+    that re-authenticates once when the session ID has expired.
+    """
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        session_id: str | None = None,
+        host: str = API_HOST,
+        on_session_refresh: Callable[[str], None] | None = None,
+        session: aiohttp.ClientSession | None = None,
+    ) -> None:
+        """Initialize the client.
+
+        Without a session, the client creates and owns its own pooled session.
+        """
+        self._username = username
+        self._password = password
+        self._host = host
+        self._session = session
+        self._owns_session = session is None
+        self._auth = SessionManager(self._async_login, session_id, on_session_refresh)
+        self.circuit_breaker = CircuitBreaker()
+        self.metrics = MeltemMetrics()
+
+    @property
+    def session_id(self) -> str | None:
+        """Return the current session ID."""
+        return self._auth.session_id
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled HTTP session, creating it on first use."""
+        if self._session is None or (self._owns_session and self._session.closed):
+            self._session = create_session()
+        return self._session
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any],
+    ) -> bytes:
+        """Send an authenticated request and return the raw response body."""
+        session = self._get_session()
+        url = f"{self._host}{endpoint}"
+
+        for attempt in range(2):
+            session_id = await self._auth.async_get()
+            payload = {
+                "apiKey": API_KEY,
+                "sessionId": session_id,
+                **params,
+            }
+            if method == "GET":
+                request_kwargs = {"params": payload}
+            else:
+                request_kwargs = {"data": payload, "headers": FORM_HEADERS}
+
+            async with self._guard(), self._measure(endpoint) as measurement:
+                async with async_timeout.timeout(API_TIMEOUT):
+                    async with session.request(method, url, **request_kwargs) as response:
+                        if response.status != 401 or attempt:
+                            response.raise_for_status()
+                            body = await response.read()
+                            measurement["size"] = len(body)
+                            return body
+
+            _LOGGER.debug("Session expired while requesting %s", endpoint)
+            self.metrics.reauthentications += 1
+            await self._auth.async_refresh(session_id, rejected=True)
+
+    @asynccontextmanager
+    async def _guard(self) -> AsyncIterator[None]:
+        """Check the circuit breaker before a request and record its outcome."""
+        self.circuit_breaker.before_request()
+        try:
+            yield
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            if RetryPolicy.is_retryable(error):
+                self.circuit_breaker.record_failure()
+            else:
+                # The API answered, the request itself was rejected
+                self.circuit_breaker.record_success()
+            raise
+        except asyncio.CancelledError:
+            self.circuit_breaker.release_probe()
+            raise
+        self.circuit_breaker.record_success()
+
+    @asynccontextmanager
+    async def _measure(self, endpoint: str) -> AsyncIterator[dict[str, int]]:
+        """Record the latency, response size and outcome of a request."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        measurement = {"size": 0}
+        try:
+            yield measurement
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self.metrics.record_request(endpoint, loop.time() - start, failed=True)
+            raise
+        self.metrics.record_request(endpoint, loop.time() - start, measurement["size"])
+
+    async def async_authenticate(self) -> str:
+        """Authenticate with username and password and return the new session ID."""
+        return await self._auth.async_refresh(self._auth.session_id)
+
+    async def _async_login(self) -> str:
+        """Send the login request and return the session ID."""
+        session = self._get_session()
+
+        async with self._guard(), self._measure(API_AUTH_ENDPOINT) as measurement:
+            async with async_timeout.timeout(API_TIMEOUT), session.post(
+                f"{self._host}{API_AUTH_ENDPOINT}",
+                headers=FORM_HEADERS,
+                data={
+                    "apiKey": API_KEY,
+                    "username": self._username,
+                    "password": self._password,
+                },
+            ) as response:
+                response.raise_for_status()
+                body = await response.read()
+                measurement["size"] = len(body)
+
+        return json_loads(body)["sessionId"]
+
+    async def async_get_bridges(self) -> list[dict[str, Any]]:
+        """Return the bridges of the account."""
+        data = json_loads(await self._request("GET", API_BRIDGES_ENDPOINT, {}))
+        return data.get("bridges", [])
+
+    async def async_get_devices(self, bridge_id: str) -> list[dict[str, Any]]:
+        """Return the devices connected to a bridge."""
+        data = json_loads(
+            await self._request(
+                "GET",
+                API_BRIDGE_DEVICES_ENDPOINT,
+                {"bridgeId": bridge_id},
+            )
+        )
+        return data.get("devices", [])
+
+    async def async_get_live_data(
+        self,
+        device_id: str,
+        registers: Iterable[int],
+    ) -> bytes:
+        """Return the raw response with the current values of the given registers of a device.
+
+        The response is decoded by the caller, see LiveDataDecoder.
+        """
+        return await self._request(
+            "GET",
+            API_LIVE_DATA_ENDPOINT,
+            {
+                "deviceId": device_id,
+                "registers": ",".join(str(register) for register in registers),
+            },
+        )
+
+    async def async_set_register(
+        self,
+        device_id: str,
+        register: int,
+        values: Iterable[int],
+    ) -> None:
+        """Write values to a device register."""
+        await self._request(
+            "POST",
+            API_SET_DATA_ENDPOINT,
+            {
+                "deviceId": device_id,
+                "register": register,
+                "values": ",".join(str(value) for value in values),
+            },
+        )
+
+    async def async_close(self) -> None:
+        """Close the HTTP session if the client created it."""
+        if self._session and self._owns_session:
+            await self._session.close()
@@ -0,0 +1,95 @@
+"""Debounced command queue for Meltem devices."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import COMMAND_DEBOUNCE_DELAY
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DeviceCommandQueue:
+    """Coalesce register writes for a single device.
+
+    A write replaces any pending write to the same register, so only the
+    latest value is sent once the debounce window has passed without new
+    writes. Writes are sent in the background, one at a time.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        device_id: str,
+        send: Callable[[str, int, list[int]], Awaitable[None]],
+        delay: float = COMMAND_DEBOUNCE_DELAY,
+    ) -> None:
+        """Initialize the queue."""
+        self._hass = hass
+        self._device_id = device_id
+        self._send = send
+        self._delay = delay
+        self._pending: dict[int, list[int]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._task: asyncio.Task | None = None
+
+    @callback
+    def async_queue(self, register: int, values: list[int]) -> None:
+        """Queue a write, replacing a pending write to the same register."""
+        self._pending[register] = values
+        if self._timer:
+            self._timer.cancel()
+        self._timer = self._hass.loop.call_later(self._delay, self._async_flush)
+
+    @callback
+    def async_clear(self) -> None:
+        """Drop all pending writes."""
+        self._pending.clear()
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    @callback
+    def _async_flush(self) -> None:
+        """Start sending the pending writes."""
+        self._timer = None
+        if self._task and not self._task.done():
+            # The running task picks up the new writes when it is done
+            return
+        self._task = self._hass.async_create_task(self._async_send_pending())
+
+    async def _async_send_pending(self) -> None:
+        """Send pending writes until none are left."""
+        while self._pending:
+            register = next(iter(self._pending))
+            values = self._pending.pop(register)
+            try:
+                await self._send(self._device_id, register, values)
+            except Exception as error:  # pylint: disable=broad-except
+                _LOGGER.error(
+                    "Error writing register %s of device %s: %s",
+                    register,
+                    self._device_id,
+                    error,
+                )
+
+    async def async_cancel(self) -> None:
+        """Drop pending writes and wait until a write in progress is cancelled.
+
+        Used before another write to the device, so a speed write waiting to
+        be retried cannot land after it.
+        """
+        self.async_clear()
+        if self._task and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Drop pending writes and cancel a write in progress."""
+        self.async_clear()
+        if self._task and not self._task.done():
+            self._task.cancel()
@@ -13,11 +13,56 @@ API_LIVE_DATA_ENDPOINT = "/v1/device/data/live"
 API_SET_DATA_ENDPOINT = "/v1/device/data/set"
 USER_AGENT = "meltem/113 CFNetwork/1568.300.101 Darwin/24.2.0"
 
+# HTTP connection pool
+API_TIMEOUT = 10  # seconds per request
+API_CONNECTION_LIMIT = 12  # Open connections to the API host
+API_DNS_CACHE_TTL = 300  # seconds
+API_KEEPALIVE_TIMEOUT = 60  # seconds an idle connection is kept open
+DATA_SESSION_POOL = f"{DOMAIN}_session_pool"  # hass.data key of the shared HTTP session
+
+# Sessions are refreshed after this fraction of their observed lifetime
+SESSION_REFRESH_MARGIN = 0.9
+SESSION_LIFETIME_SAMPLES = 3  # Expiries observed before sessions are refreshed ahead of time
+SESSION_LIFETIME_MIN = 300  # seconds, shorter expiries are taken for server-side invalidations
+
+# Circuit breaker
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+CIRCUIT_FAILURE_THRESHOLD = 3  # Consecutive failed requests before the circuit opens
+CIRCUIT_RESET_TIMEOUT = 30  # seconds before a probe request is let through
+CIRCUIT_MAX_RESET_TIMEOUT = 300  # seconds
+
+# Command retries
+RETRY_BASE_DELAY = 0.5  # seconds, doubled for every attempt
+RETRY_MAX_DELAY = 8  # seconds
+RETRY_DEADLINE = 30  # seconds for all attempts together
+RETRY_MAX_ATTEMPTS = 8
+
+# Metrics
+METRICS_LATENCY_BUCKETS = (0.0001, 0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)  # seconds
+
+# Profiling
+PROFILE_DEFAULT_CYCLES = 5  # Update cycles recorded by the profile service
+PROFILE_TOP_ENTRIES = 50  # Functions and allocation sites listed in the report
+
+# Rolling statistics of the registers marked with "statistics"
+STATISTICS_WINDOW = 900  # seconds covered by the min, max and mean
+STATISTICS_RESOLUTION = 30  # seconds aggregated into one bucket of the window
+
+# Services
+SERVICE_PROFILE = "profile"
+SERVICE_GET_STATISTICS = "get_statistics"
+ATTR_CYCLES = "cycles"
+ATTR_MEMORY = "memory"
+ATTR_DEVICE_ID = "device_id"
+
 # Config
 CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
 CONF_SESSION_ID = "session_id"
 CONF_BRIDGES = "bridges"
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
 
 # Device Types
 DEVICE_TYPE_BRIDGE = "bridge"
@@ -25,6 +70,44 @@ DEVICE_TYPE_VENTILATION = "ventilation"
 
 # Update intervals
 DEFAULT_UPDATE_INTERVAL = 2  # seconds
+TOPOLOGY_REFRESH_INTERVAL = 3600  # seconds between bridge/device list refreshes
+
+# Last known data, persisted so entities have values before the first refresh
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.snapshot"  # Suffixed with the config entry ID
+STORAGE_SAVE_DELAY = 60  # seconds, saves requested in between are coalesced
+
+# Dispatcher signal for devices and registers seen for the first time, formatted with the entry ID
+SIGNAL_NEW_ENTITIES = f"{DOMAIN}_new_entities_{{}}"
+
+# Polling
+# Concurrent API requests per update cycle, enough to poll a dozen units at once
+DEFAULT_MAX_CONCURRENT_REQUESTS = API_CONNECTION_LIMIT
+
+# Adaptive per-device polling
+POLL_INTERVAL_MIN = DEFAULT_UPDATE_INTERVAL  # seconds, while a device is changing
+POLL_INTERVAL_MAX = 30  # seconds, while a device is idle
+POLL_BACKOFF_FACTOR = 2  # Interval multiplier for every poll without changes
+POLL_BOOST_DURATION = 30  # seconds of fast polling after a set command
+POLL_JITTER = 0.2  # Fraction of the interval used to spread polls
+
+# Commands
+COMMAND_DEBOUNCE_DELAY = 0.5  # seconds without changes before a queued write is sent
+
+# Register refresh tiers, polled at most every given number of seconds
+REFRESH_TIER_FAST = "fast"  # Mode, speed and air flow, every poll
+REFRESH_TIER_MEDIUM = "medium"  # Climate readings
+REFRESH_TIER_SLOW = "slow"  # Counters and rarely changing status
+REFRESH_TIER_INTERVALS = {
+    REFRESH_TIER_FAST: 0,
+    REFRESH_TIER_MEDIUM: 60,
+    REFRESH_TIER_SLOW: 3600,
+}
+
+# Live data sentinels
+LIVE_DATA_ERROR_STATUS = 1001  # Status of a register that could not be read
+LIVE_DATA_NAN = "NaN"  # Value of a sensor that is not fitted or not ready
+LIVE_DATA_INVALID_VALUE = 32767  # Value of a register without a valid reading
 
 # Ventilation Control
 VENTILATION_REGISTER = 41120  # Register used to set the ventilation level
@@ -40,6 +123,19 @@ VENTILATION_LEVELS = {
     "manual": [3, 112] + [0] * 11,  # Manual mode
 }
 
+# Registers read by the select, number and switch entities, always requested
+CONTROL_REGISTERS = frozenset({VENTILATION_STATUS_REGISTER, VENTILATION_SPEED_REGISTER})
+
+# Registers whose changes keep a device at the fast polling interval
+ADAPTIVE_POLL_REGISTERS = (
+    41016,  # Error status
+    41020,  # Extract air flow
+    41021,  # Supply air flow
+    41100,  # Operation mode
+    VENTILATION_STATUS_REGISTER,
+    VENTILATION_SPEED_REGISTER,
+)
+
 # Value mapping for ventilation levels
 VENTILATION_VALUE_MAP = {
     0: "off",
@@ -92,6 +188,7 @@ REGISTER_DEFINITIONS = {
         "device_class": "problem",
         "state_class": None,
         "icon": "mdi:alert-circle",
+        "refresh_tier": REFRESH_TIER_FAST,
         "value_map": {0: "OK", 1: "Error"},
         "entity_category": "diagnostic",
     },
@@ -101,6 +198,7 @@ REGISTER_DEFINITIONS = {
         "device_class": None,
         "state_class": None,
         "icon": "mdi:snowflake-alert",
+        "refresh_tier": REFRESH_TIER_MEDIUM,
         "value_map": {0: "Inactive", 1: "Active"},
         "entity_category": "diagnostic",
     },
@@ -109,7 +207,10 @@ REGISTER_DEFINITIONS = {
         "unit": "°C",
         "device_class": "temperature",
         "state_class": "measurement",
+        "statistics": True,
         "icon": "mdi:thermometer-minus",
+        "refresh_tier": REFRESH_TIER_MEDIUM,
+        "max_value": 100,  # Higher readings are invalid
         "suggested_display_precision": 1,
     },
     41002: {
@@ -117,7 +218,10 @@ REGISTER_DEFINITIONS = {
         "unit": "°C",
         "device_class": "temperature",
         "state_class": "measurement",
+        "statistics": True,
         "icon": "mdi:thermometer",
+        "refresh_tier": REFRESH_TIER_MEDIUM,
+        "max_value": 100,  # Higher readings are invalid
         "suggested_display_precision": 1,
     },
     41000: {
@@ -125,7 +229,9 @@ REGISTER_DEFINITIONS = {
         "unit": "°C",
         "device_class": "temperature",
         "state_class": "measurement",
+        "statistics": True,
         "icon": "mdi:thermometer-high",
+        "refresh_tier": REFRESH_TIER_MEDIUM,
         "suggested_display_precision": 1,
     },
     41009: {
@@ -133,7 +239,9 @@ REGISTER_DEFINITIONS = {
         "unit": "°C",
         "device_class": "temperature",
         "state_class": "measurement",
+        "statistics": True,
         "icon": "mdi:thermometer-low",
+        "refresh_tier": REFRESH_TIER_MEDIUM,
         "suggested_display_precision": 1,
     },
     41006: {
@@ -141,7 +249,9 @@ REGISTER_DEFINITIONS = {
         "unit": "%",
         "device_class": "humidity",
         "state_class": "measurement",
+        "statistics": True,
         "icon": "mdi:water-percent",
+        "refresh_tier": REFRESH_TIER_MEDIUM,
         "suggested_display_precision": 0,
     },
     41011: {
@@ -149,7 +259,9 @@ REGISTER_DEFINITIONS = {
         "unit": "%",
         "device_class": "humidity",
         "state_class": "measurement",
+        "statistics": True,
         "icon": "mdi:water-percent",
+        "refresh_tier": REFRESH_TIER_MEDIUM,
         "suggested_display_precision": 0,
     },
     41007: {
@@ -157,7 +269,9 @@ REGISTER_DEFINITIONS = {
         "unit": "ppm",
         "device_class": "carbon_dioxide",
         "state_class": "measurement",
+        "statistics": True,
         "icon": "mdi:molecule-co2",
+        "refresh_tier": REFRESH_TIER_MEDIUM,
         "suggested_display_precision": 0,
     },
     41013: {
@@ -165,7 +279,9 @@ REGISTER_DEFINITIONS = {
         "unit": "µg/m³",
         "device_class": "volatile_organic_compounds",
         "state_class": "measurement",
+        "statistics": True,
         "icon": "mdi:air-filter",
+        "refresh_tier": REFRESH_TIER_MEDIUM,
         "suggested_display_precision": 0,
     },
     41020: {
@@ -173,7 +289,9 @@ REGISTER_DEFINITIONS = {
         "unit": "m³/h",
         "device_class": None,
         "state_class": "measurement",
+        "statistics": True,
         "icon": "mdi:arrow-up-circle",
+        "refresh_tier": REFRESH_TIER_FAST,
         "suggested_display_precision": 0,
     },
     41021: {
@@ -181,7 +299,9 @@ REGISTER_DEFINITIONS = {
         "unit": "m³/h",
         "device_class": None,
         "state_class": "measurement",
+        "statistics": True,
         "icon": "mdi:arrow-down-circle",
+        "refresh_tier": REFRESH_TIER_FAST,
         "suggested_display_precision": 0,
     },
     41017: {
@@ -190,6 +310,7 @@ REGISTER_DEFINITIONS = {
         "device_class": "problem",
         "state_class": None,
         "icon": "mdi:air-filter-horizontal",
+        "refresh_tier": REFRESH_TIER_SLOW,
         "value_map": {0: "No", 1: "Yes"},
         "entity_category": "diagnostic",
     },
@@ -199,6 +320,7 @@ REGISTER_DEFINITIONS = {
         "device_class": "duration",
         "state_class": "measurement",
         "icon": "mdi:calendar-clock",
+        "refresh_tier": REFRESH_TIER_SLOW,
         "entity_category": "diagnostic",
         "suggested_display_precision": 0,
     },
@@ -208,6 +330,7 @@ REGISTER_DEFINITIONS = {
         "device_class": "duration",
         "state_class": "total_increasing",
         "icon": "mdi:clock-outline",
+        "refresh_tier": REFRESH_TIER_SLOW,
         "entity_category": "diagnostic",
         "suggested_display_precision": 0,
     },
@@ -217,6 +340,7 @@ REGISTER_DEFINITIONS = {
         "device_class": "duration",
         "state_class": "total_increasing",
         "icon": "mdi:fan-clock",
+        "refresh_tier": REFRESH_TIER_SLOW,
         "entity_category": "diagnostic",
         "suggested_display_precision": 0,
     },
@@ -226,6 +350,7 @@ REGISTER_DEFINITIONS = {
         "device_class": None,
         "state_class": None,
         "icon": "mdi:fan-speed-3",
+        "refresh_tier": REFRESH_TIER_FAST,
         "value_map": {0: "Off", 228: "Low", 229: "Medium", 230: "High"},
         "entity_registry_enabled_default": False,  # This is controlled via the select entity
     },
@@ -239,6 +364,7 @@ ADDITIONAL_REGISTERS = {
         "device_class": None,
         "state_class": None,
         "icon": "mdi:cog",
+        "refresh_tier": REFRESH_TIER_FAST,
         "value_map": {1: "Normal", 3: "Manual"},
         "entity_category": "diagnostic",
     },
@@ -248,6 +374,7 @@ ADDITIONAL_REGISTERS = {
         "device_class": None,
         "state_class": None,
         "icon": "mdi:fan",
+        "refresh_tier": REFRESH_TIER_FAST,
         "value_map": {0: "Off", 228: "Low", 229: "Medium", 230: "High", 112: "Manual"},
     },
     41102: {
@@ -256,6 +383,7 @@ ADDITIONAL_REGISTERS = {
         "device_class": None,
         "state_class": None,
         "icon": "mdi:help",
+        "refresh_tier": REFRESH_TIER_SLOW,
         "entity_registry_enabled_default": False,
     },
     41103: {
@@ -264,6 +392,7 @@ ADDITIONAL_REGISTERS = {
         "device_class": None,
         "state_class": None,
         "icon": "mdi:help",
+        "refresh_tier": REFRESH_TIER_SLOW,
         "entity_registry_enabled_default": False,
     },
     41104: {
@@ -272,6 +401,7 @@ ADDITIONAL_REGISTERS = {
         "device_class": None,
         "state_class": None,
         "icon": "mdi:help",
+        "refresh_tier": REFRESH_TIER_SLOW,
         "entity_registry_enabled_default": False,
     },
     41106: {
@@ -280,6 +410,7 @@ ADDITIONAL_REGISTERS = {
         "device_class": None,
         "state_class": None,
         "icon": "mdi:help",
+        "refresh_tier": REFRESH_TIER_SLOW,
         "entity_registry_enabled_default": False,
     },
     41113: {
@@ -287,7 +418,9 @@ ADDITIONAL_REGISTERS = {
         "unit": "%",
         "device_class": None,
         "state_class": "measurement",
+        "statistics": True,
         "icon": "mdi:fan-speed-3",
+        "refresh_tier": REFRESH_TIER_FAST,
         "value_transform": lambda value: round(0 if value == 0 else (value * 100 / 41385)),
         "suggested_display_precision": 0,
     },
@@ -297,6 +430,7 @@ ADDITIONAL_REGISTERS = {
         "device_class": None,
         "state_class": None,
         "icon": "mdi:fan-speed-3",
+        "refresh_tier": REFRESH_TIER_FAST,
         "entity_registry_enabled_default": False,  # This is only used internally
     },
 }
@@ -1,51 +1,97 @@
 """Data update coordinator for Meltem integration."""
+from collections.abc import Awaitable, Callable, Coroutine
 from datetime import timedelta
+from functools import partial
 import asyncio
 import logging
-from typing import Any
+import time
+from typing import Any, TypeVar
 
 import aiohttp
-import async_timeout
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import Platform
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
+from .api import CircuitBreaker, CircuitOpenError, MeltemApiClient, RetryPolicy
+from .commands import DeviceCommandQueue
 from .const import (
-    API_HOST,
-    API_KEY,
-    API_AUTH_ENDPOINT,
-    API_BRIDGES_ENDPOINT,
-    API_BRIDGE_DEVICES_ENDPOINT,
-    API_LIVE_DATA_ENDPOINT,
-    API_SET_DATA_ENDPOINT,
-    USER_AGENT,
     DEFAULT_UPDATE_INTERVAL,
+    TOPOLOGY_REFRESH_INTERVAL,
+    STORAGE_KEY,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    SIGNAL_NEW_ENTITIES,
     REGISTER_DEFINITIONS,
     ADDITIONAL_REGISTERS,
+    REFRESH_TIER_FAST,
+    REFRESH_TIER_INTERVALS,
+    ADAPTIVE_POLL_REGISTERS,
     VENTILATION_REGISTER,
     VENTILATION_LEVELS,
     VENTILATION_MANUAL_MIN,
     VENTILATION_MANUAL_MAX,
     VENTILATION_MANUAL_REGISTER,
+    CONTROL_REGISTERS,
+    STATISTICS_RESOLUTION,
+    STATISTICS_WINDOW,
     calculate_manual_value,
+    convert_voc_ppm_to_ugm3,
 )
+from .decoder import LiveDataDecoder
+from .device import async_setup_devices
+from .metrics import MeltemMetrics
+from .profiler import CycleProfiler
+from .rolling import RegisterStatistics
+from .scheduler import DevicePollScheduler
+from .snapshot import SnapshotStore
 
 _LOGGER = logging.getLogger(__name__)
 
-ALL_REGISTERS = list({
+_T = TypeVar("_T")
+
+ALL_REGISTERS = sorted({
     *REGISTER_DEFINITIONS.keys(),
     *ADDITIONAL_REGISTERS.keys(),
 })
 
+# Registers with rolling statistics, with the conversion of their raw values to sensor units
+STATISTICS_CONVERTERS = {
+    register: (
+        convert_voc_ppm_to_ugm3
+        if info.get("device_class") == "volatile_organic_compounds"
+        else info.get("value_transform")
+    )
+    for register, info in {**REGISTER_DEFINITIONS, **ADDITIONAL_REGISTERS}.items()
+    if info.get("statistics")
+}
+
+# Suffix of the unique ID of the statistics sensor of a register
+STATISTICS_UNIQUE_ID_SUFFIX = "_statistics"
+
+
+def _group_registers_by_tier() -> dict[str, list[int]]:
+    """Group the known registers by how often they need to be refreshed."""
+    tiers: dict[str, list[int]] = {tier: [] for tier in REFRESH_TIER_INTERVALS}
+    for register, info in {**REGISTER_DEFINITIONS, **ADDITIONAL_REGISTERS}.items():
+        tiers[info.get("refresh_tier", REFRESH_TIER_FAST)].append(register)
+    return tiers
+
+REGISTER_TIERS = _group_registers_by_tier()
+
 class MeltemCoordinator(DataUpdateCoordinator):
     """Class to manage fetching Meltem data."""
 
     def __init__(
         self,
         hass: HomeAssistant,
-        username: str,
-        password: str,
-        session_id: str,
+        client: MeltemApiClient,
+        max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
     ) -> None:
         """Initialize the coordinator."""
         super().__init__(
@@ -54,228 +100,475 @@ class MeltemCoordinator(DataUpdateCoordinator):
             name="Meltem",
             update_interval=timedelta(seconds=DEFAULT_UPDATE_INTERVAL),
         )
-        self._username = username
-        self._password = password
-        self._session_id = session_id
-        self._session = aiohttp.ClientSession()
-        self.bridges = {}
-        self.devices = {}
-
-    async def _async_update_data(self) -> dict[str, Any]:
+        self._client = client
+        # Caps the number of requests in flight; 1 restores sequential polling
+        self._request_semaphore = asyncio.Semaphore(max(1, max_concurrent_requests))
+        # Bridges, devices and register values, updated in place and exposed as data
+        self._store = SnapshotStore(ALL_REGISTERS)
+        self._decoder = LiveDataDecoder(
+            self._store.index,
+            {**REGISTER_DEFINITIONS, **ADDITIONAL_REGISTERS},
+        )
+        # Windowed min, max and mean of measurement registers, filled on every poll
+        self._statistics = RegisterStatistics(
+            STATISTICS_CONVERTERS, STATISTICS_WINDOW, STATISTICS_RESOLUTION
+        )
+        # True if devices were added or removed since listeners were last notified
+        self._devices_changed = False
+        # Loop time of the last bridge/device list refresh, None forces a refresh
+        self._topology_updated: float | None = None
+        self._scheduler = DevicePollScheduler()
+        # Loop time at which each register tier was last fetched, per device
+        self._tier_fetched: dict[str, dict[str, float]] = {}
+        # Registers whose sensor entity is disabled in the entity registry, per device
+        self._disabled_registers: dict[str, frozenset[int]] = {}
+        # Entity IDs of the config entry, to recognize removals of its entities
+        self._entity_ids: set[str] = set()
+        # In-flight fetches and refreshes per device, with the loop time they started
+        self._device_polls: dict[str, tuple[float, asyncio.Task]] = {}
+        self._device_refreshes: dict[str, tuple[float, asyncio.Task]] = {}
+        # Loop time of the last command sent to each device
+        self._last_command: dict[str, float] = {}
+        self._command_queues: dict[str, DeviceCommandQueue] = {}
+        self._retry_policy = RetryPolicy(on_retry=client.metrics.record_command_retry)
+        # True while the last known data is served because the API is unavailable
+        self.stale = False
+        # (device_id, register) keys changed by the last update, None notifies everyone
+        self._changed_keys: set[tuple[str, int]] | None = None
+        self._notified_availability: tuple[bool, bool] | None = None
+        # Set by the profile service, told about every finished update cycle
+        self.profiler: CycleProfiler | None = None
+        # Last known data of the config entry, saved after updates and restored at startup
+        self._persist: Store[dict[str, Any]] | None = None
+        if self.config_entry is not None:
+            self._persist = Store(
+                hass, STORAGE_VERSION, f"{STORAGE_KEY}.{self.config_entry.entry_id}"
+            )
+        # True from scheduling a save until the store writes it
+        self._save_pending = False
+        # True while the data was restored and no update has succeeded since
+        self._restored = False
+        # Registers with entities per device, None until discovery is enabled
+        self._discovered: dict[str, set[int]] | None = None
+
+    async def async_restore(self) -> bool:
+        """Load the data saved by a previous run and return True if there was any.
+
+        Restored data is served as stale until the first successful update.
+        """
+        if self._persist is None or not (data := await self._persist.async_load()):
+            return False
+        self._store.restore(data)
+        if not self._store.devices:
+            return False
+        self._restored = True
+        self.stale = True
+        self.data = self._store
+        _LOGGER.debug("Restored last known data of %d device(s)", len(self._store.devices))
+        return True
+
+    @callback
+    def async_enable_discovery(self) -> None:
+        """Treat the current devices and registers as known and announce new ones from now on.
+
+        Called once the platforms create entities for the current data.
+        """
+        self._discovered = {
+            device_id: set(self._store.registers(device_id))
+            for device_id in self._store.devices
+        }
+
+    @callback
+    def _async_discover(self) -> None:
+        """Register new devices and tell the platforms about new devices and registers."""
+        if self._discovered is None:
+            return
+        new_devices = [
+            device_id for device_id in self._store.devices if device_id not in self._discovered
+        ]
+        new_registers: dict[str, set[int]] = {}
+        for device_id in self._store.devices:
+            known = self._discovered.setdefault(device_id, set())
+            registers = set(self._store.registers(device_id)) - known
+            if registers:
+                known.update(registers)
+                new_registers[device_id] = registers
+        if not new_devices and not new_registers:
+            return
+
+        _LOGGER.debug(
+            "Discovered %d new device(s) and new registers on %d device(s)",
+            len(new_devices),
+            len(new_registers),
+        )
+        if new_devices:
+            devices = {device_id: self._store.devices[device_id] for device_id in new_devices}
+            bridges = {
+                bridge_id: bridge
+                for bridge_id, bridge in self._store.bridges.items()
+                if any(device.get("bridge_id") == bridge_id for device in devices.values())
+            }
+            async_setup_devices(self.hass, self.config_entry.entry_id, bridges, devices)
+        async_dispatcher_send(
+            self.hass,
+            SIGNAL_NEW_ENTITIES.format(self.config_entry.entry_id),
+            new_devices,
+            new_registers,
+        )
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Save the current data after a delay, coalescing saves requested meanwhile.
+
+        Store.async_delay_save restarts its timer on every call, so it is only
+        called while no save is pending, otherwise polls every few seconds
+        would postpone the write forever.
+        """
+        if self._persist is not None and not self._save_pending:
+            self._save_pending = True
+            self._persist.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to save, called by the store when it writes."""
+        self._save_pending = False
+        return self._store.as_dict()
+
+    async def _async_update_data(self) -> SnapshotStore:
         """Fetch data from Meltem API."""
+        start = self.hass.loop.time()
         try:
-            # First, get the list of bridges
-            bridges = await self._fetch_bridges()
-
-            # Then get devices for each bridge
-            all_devices = {}
-            device_data = {}
-
-            for bridge_id in bridges:
-                devices = await self._fetch_devices(bridge_id)
-                all_devices.update(devices)
-
-                # Get live data for each device
-                for device_id in devices:
-                    data = await self._fetch_live_data(device_id)
-                    device_data[device_id] = data
-
-            return {
-                "bridges": bridges,
-                "devices": all_devices,
-                "data": device_data,
-            }
+            return await self._async_update_cycle()
+        finally:
+            self.metrics.cycle.record(self.hass.loop.time() - start)
+            if self.profiler is not None:
+                self.profiler.async_cycle_done()
+
+    async def _async_update_cycle(self) -> SnapshotStore:
+        """Refresh the topology if needed and poll the devices that are due."""
+        try:
+            if self._topology_is_stale():
+                await self._refresh_topology()
 
-        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            # Only poll the devices that are due, the rest keep their last data
+            due = self._scheduler.due_devices(self._store.devices, self.hass.loop.time())
+            results = await asyncio.gather(
+                *(self._async_poll_device(device_id) for device_id in due)
+            )
+
+            # Only notify the entities of changed registers, unless devices came or went
+            changed_keys: set[tuple[str, int]] | None = (
+                None if self._devices_changed else set()
+            )
+            for device_id, changed in zip(due, results):
+                if changed is None or changed_keys is None:
+                    changed_keys = None
+                else:
+                    changed_keys.update((device_id, register) for register in changed)
+
+            self._changed_keys = changed_keys
+            self._devices_changed = False
+            self._restored = False
+            self.stale = False
+            self._async_schedule_save()
+            self._async_discover()
+
+            return self._store
+
+        except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError) as error:
+            if isinstance(error, aiohttp.ClientResponseError) and error.status in (400, 403, 404):
+                # A device or bridge may have been removed, re-fetch the topology
+                self._topology_updated = None
+            if self.data is not None and (self._restored or not self.circuit_breaker.is_closed):
+                # The cloud is down or not reached yet, keep serving the last known data
+                _LOGGER.debug("Serving stale data while the API is unavailable: %s", error)
+                self.stale = True
+                return self.data
             raise UpdateFailed(f"Error communicating with API: {error}")
 
-    async def _fetch_bridges(self) -> dict[str, Any]:
-        """Fetch list of bridges."""
-        headers = self._get_headers()
-        params = {
-            "apiKey": API_KEY,
-            "sessionId": self._session_id,
-        }
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify the listeners of changed registers, or all when availability changed.
+
+        Entities subscribe with a context of (device_id, register) keys;
+        listeners without a context are always notified.
+        """
+        start = time.perf_counter()
+        changed, self._changed_keys = self._changed_keys, None
+        availability = (self.last_update_success, self.stale)
+        if changed is None or availability != self._notified_availability:
+            self._notified_availability = availability
+            super().async_update_listeners()
+        else:
+            for update_callback, context in list(self._listeners.values()):
+                if context is None or not changed.isdisjoint(context):
+                    update_callback()
+        self.metrics.fan_out.record(time.perf_counter() - start)
+
+    def sample_age(self, device_id: str, register: int) -> float | None:
+        """Return the seconds since the cloud sampled a register of a device, or None."""
+        last_update = self._store.last_update(device_id, register)
+        if last_update is None:
+            return None
+        return max(0.0, dt_util.utcnow().timestamp() - last_update / 1000)
+
+    def register_statistics(self, device_id: str, register: int) -> dict[str, Any] | None:
+        """Return the min, max, mean and sample count of a register over the statistics window."""
+        return self._statistics.summary(device_id, register, self.hass.loop.time())
+
+    def sample_ages(self, device_id: str) -> dict[int, float]:
+        """Return the sample age in seconds of every register of a device that has one."""
+        ages = {}
+        for register in self._store.registers(device_id):
+            age = self.sample_age(device_id, register)
+            if age is not None:
+                ages[register] = age
+        return ages
+
+    @property
+    def metrics(self) -> MeltemMetrics:
+        """Return the request and update cycle metrics."""
+        return self._client.metrics
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        """Return the circuit breaker guarding the API."""
+        return self._client.circuit_breaker
+
+    def _topology_is_stale(self) -> bool:
+        """Return True if the bridge and device lists need to be re-fetched."""
+        return (
+            self._topology_updated is None
+            or self.hass.loop.time() - self._topology_updated >= TOPOLOGY_REFRESH_INTERVAL
+        )
 
-        async with async_timeout.timeout(10):
-            async with self._session.get(
-                f"{API_HOST}{API_BRIDGES_ENDPOINT}",
-                headers=headers,
-                params=params,
-            ) as response:
-                if response.status == 401:
-                    await self._refresh_session()
-                    params["sessionId"] = self._session_id
-                    async with self._session.get(
-                        f"{API_HOST}{API_BRIDGES_ENDPOINT}",
-                        headers=headers,
-                        params=params,
-                    ) as retry_response:
-                        retry_response.raise_for_status()
-                        data = await retry_response.json()
-                else:
-                    response.raise_for_status()
-                    data = await response.json()
+    async def _refresh_topology(self) -> None:
+        """Fetch the bridges and their devices."""
+        bridges = await self._fetch_bridges()
+
+        all_devices = {}
+        for devices in await asyncio.gather(
+            *(self._limited(self._fetch_devices(bridge_id)) for bridge_id in bridges)
+        ):
+            all_devices.update(devices)
+
+        if all_devices.keys() != self._store.devices.keys():
+            self._devices_changed = True
+        self._store.bridges = bridges
+        self._store.devices = all_devices
+        self._store.retain_devices(all_devices)
+        self._statistics.retain_devices(all_devices)
+        self._topology_updated = self.hass.loop.time()
+        _LOGGER.debug(
+            "Refreshed topology: %d bridge(s), %d device(s)",
+            len(bridges),
+            len(all_devices),
+        )
 
-                bridges = {}
-                for bridge in data.get("bridges", []):
-                    bridge_id = bridge.get("bridgeId")
-                    if bridge_id:
-                        bridges[bridge_id] = bridge
-                return bridges
+    async def async_refresh_topology(self) -> None:
+        """Re-fetch the bridge and device lists on the next update."""
+        self._topology_updated = None
+        await self.async_request_refresh()
 
-    async def _fetch_devices(self, bridge_id: str) -> dict[str, Any]:
-        """Fetch devices for a specific bridge."""
-        headers = self._get_headers()
-        params = {
-            "apiKey": API_KEY,
-            "sessionId": self._session_id,
-            "bridgeId": bridge_id,
-        }
+    async def _limited(self, awaitable: Awaitable[_T]) -> _T:
+        """Await a request while holding a concurrency slot."""
+        async with self._request_semaphore:
+            return await awaitable
 
-        async with async_timeout.timeout(10):
-            async with self._session.get(
-                f"{API_HOST}{API_BRIDGE_DEVICES_ENDPOINT}",
-                headers=headers,
-                params=params,
-            ) as response:
-                if response.status == 401:
-                    await self._refresh_session()
-                    params["sessionId"] = self._session_id
-                    async with self._session.get(
-                        f"{API_HOST}{API_BRIDGE_DEVICES_ENDPOINT}",
-                        headers=headers,
-                        params=params,
-                    ) as retry_response:
-                        retry_response.raise_for_status()
-                        data = await retry_response.json()
-                else:
-                    response.raise_for_status()
-                    data = await response.json()
-
-                devices = {}
-                for device in data.get("devices", []):
-                    device_id = device.get("deviceId")
-                    if device_id:
-                        device["bridge_id"] = bridge_id
-                        devices[device_id] = device
-                return devices
-
-    async def _fetch_live_data(self, device_id: str) -> dict[str, Any]:
-        """Fetch live data for a specific device."""
-        headers = self._get_headers()
-        params = {
-            "apiKey": API_KEY,
-            "sessionId": self._session_id,
-            "deviceId": device_id,
-            "registers": ",".join(str(reg) for reg in ALL_REGISTERS),
-        }
+    def _shared_task(
+        self,
+        tasks: dict[str, tuple[float, asyncio.Task]],
+        device_id: str,
+        factory: Callable[[], Coroutine[Any, Any, _T]],
+    ) -> Awaitable[_T]:
+        """Join the task in flight for a device, or start a new one.
+
+        A task that started before the last command sent to the device is not
+        joined, so callers never receive data from before their own write.
+        """
+        inflight = tasks.get(device_id)
+        if inflight is None or inflight[0] <= self._last_command.get(device_id, float("-inf")):
+            task = self.hass.async_create_task(factory())
+            inflight = tasks[device_id] = (self.hass.loop.time(), task)
+
+            def _done(_: asyncio.Task) -> None:
+                if tasks.get(device_id) is inflight:
+                    del tasks[device_id]
+
+            task.add_done_callback(_done)
+        return asyncio.shield(inflight[1])
+
+    def _async_poll_device(self, device_id: str) -> Awaitable[set[int] | None]:
+        """Fetch live data for a device, sharing a fetch already in flight."""
+        return self._shared_task(
+            self._device_polls,
+            device_id,
+            partial(self._poll_device, device_id),
+        )
 
-        async with async_timeout.timeout(10):
-            async with self._session.get(
-                f"{API_HOST}{API_LIVE_DATA_ENDPOINT}",
-                headers=headers,
-                params=params,
-            ) as response:
-                if response.status == 401:
-                    await self._refresh_session()
-                    params["sessionId"] = self._session_id
-                    async with self._session.get(
-                        f"{API_HOST}{API_LIVE_DATA_ENDPOINT}",
-                        headers=headers,
-                        params=params,
-                    ) as retry_response:
-                        retry_response.raise_for_status()
-                        data = await retry_response.json()
-                else:
-                    response.raise_for_status()
-                    data = await response.json()
-
-                formatted_data = {}
-                for item in data.get("data", []):
-                    address = item.get("address")
-                    if address is not None:
-                        # Check if the item has a status code
-                        if "status" in item:
-                            status = item.get("status")
-                            _LOGGER.debug(
-                                "Register %s returned status code: %s",
-                                address,
-                                status
-                            )
-                            # Skip registers with error status codes
-                            if status == 1001:
-                                continue
-                            formatted_data[address] = {
-                                "value": None,
-                                "status": status,
-                                "last_update": item.get("lastUpdate")
-                            }
-                        else:
-                            value = item.get("value")
-                            # Handle special values
-                            if value == "NaN":
-                                _LOGGER.debug(
-                                    "Register %s returned NaN value",
-                                    address
-                                )
-                                continue
-                            if isinstance(value, (int, float)) and value == 32767:
-                                _LOGGER.debug(
-                                    "Register %s returned max value (32767), treating as invalid",
-                                    address
-                                )
-                                continue
-                            # Check for humidity values above 100%
-                            if address in [41002, 41004] and isinstance(value, (int, float)) and value > 100:
-                                _LOGGER.debug(
-                                    "Register %s returned humidity value above 100%% (%s), treating as invalid",
-                                    address,
-                                    value
-                                )
-                                continue
-                            formatted_data[address] = {
-                                "value": value,
-                                "last_update": item.get("lastUpdate")
-                            }
-                return formatted_data
-
-    def _get_headers(self) -> dict[str, str]:
-        """Get common headers for API requests."""
-        return {
-            "User-Agent": USER_AGENT,
-            "Accept": "*/*",
-            "Accept-Language": "en-GB,en;q=0.9",
-            "Accept-Encoding": "gzip, deflate, br",
+    async def _poll_device(self, device_id: str) -> set[int] | None:
+        """Fetch live data for a device and schedule its next poll.
+
+        Returns the registers whose value changed, or None if nothing was
+        known about the device before.
+        """
+        known = self._store.has_device(device_id)
+        now = self.hass.loop.time()
+        # Only changes between two samples count as activity, not a watched register
+        # dropping out on a transient NaN or error status and coming back
+        watched = {
+            register
+            for register in ADAPTIVE_POLL_REGISTERS
+            if self._store.has(device_id, register)
         }
+        changed = await self._limited(self._fetch_device(device_id, now))
+        if not known:
+            changed = None
+            active = None
+        else:
+            active = {
+                register
+                for register in changed & watched
+                if self._store.has(device_id, register)
+            }
+        self._scheduler.record_poll(device_id, now, active)
+        return changed
+
+    async def _fetch_device(self, device_id: str, now: float) -> set[int]:
+        """Fetch the register tiers of a device that are due into the snapshot store.
+
+        Returns the registers whose value or status changed.
+        """
+        tier_fetched = self._tier_fetched.setdefault(device_id, {})
+
+        if not self._store.has_device(device_id):
+            # Nothing known about this device yet, fetch every register
+            tiers = list(REGISTER_TIERS)
+        else:
+            tiers = [
+                tier
+                for tier, interval in REFRESH_TIER_INTERVALS.items()
+                if now - tier_fetched.get(tier, float("-inf")) >= interval
+            ]
+        disabled = self._disabled_registers.get(device_id, frozenset())
+        registers = [
+            register
+            for tier in tiers
+            for register in REGISTER_TIERS[tier]
+            if register not in disabled
+        ]
+
+        # Registers that were not requested this time keep their last sample
+        changed = await self._fetch_live_data(device_id, registers)
+        for tier in tiers:
+            tier_fetched[tier] = now
+
+        snapshot = self._store.device(device_id)
+        index = self._store.index
+        for register in disabled:
+            if register in index and snapshot.clear(index[register]):
+                changed.add(register)
+        self._statistics.record(device_id, self._store, registers, now)
+        return changed
+
+    @callback
+    def async_update_enabled_registers(self) -> None:
+        """Rebuild the registers to skip for each device from the entity registry."""
+        registry = er.async_get(self.hass)
+        disabled: dict[str, set[int]] = {}
+        # Registers whose statistics sensor is enabled are fetched even if their sensor is disabled
+        needed: set[str] = set()
+        entities = er.async_entries_for_config_entry(registry, self.config_entry.entry_id)
+        self._entity_ids = {entity.entity_id for entity in entities}
+        for entity in entities:
+            if entity.domain != Platform.SENSOR:
+                continue
+            if entity.unique_id.endswith(STATISTICS_UNIQUE_ID_SUFFIX):
+                if not entity.disabled:
+                    needed.add(entity.unique_id.removesuffix(STATISTICS_UNIQUE_ID_SUFFIX))
+                continue
+            if not entity.disabled:
+                continue
+            device_id, _, register = entity.unique_id.rpartition("_")
+            if register.isdigit() and int(register) not in CONTROL_REGISTERS:
+                disabled.setdefault(device_id, set()).add(int(register))
+        for key in needed:
+            device_id, _, register = key.rpartition("_")
+            if device_id in disabled:
+                disabled[device_id].discard(int(register))
+
+        for device_id, registers in self._disabled_registers.items():
+            if not registers <= disabled.get(device_id, set()):
+                # An entity was enabled, fetch all registers on the next poll
+                self._tier_fetched.pop(device_id, None)
+
+        self._disabled_registers = {
+            device_id: frozenset(registers)
+            for device_id, registers in disabled.items()
+        }
+
+    @callback
+    def async_handle_entity_registry_updated(self, event: Event) -> None:
+        """Update the requested registers when an entity is enabled or disabled."""
+        data = event.data
+        if data["action"] == "update" and "disabled_by" not in data["changes"]:
+            return
+        # The event fires for every integration, skip the rescan for entities of other entries
+        if data["action"] == "remove":
+            if data["entity_id"] not in self._entity_ids:
+                return
+        else:
+            entity = er.async_get(self.hass).async_get(data["entity_id"])
+            if entity is None or entity.config_entry_id != self.config_entry.entry_id:
+                return
+        self.async_update_enabled_registers()
+
+    async def _fetch_bridges(self) -> dict[str, Any]:
+        """Fetch list of bridges."""
+        bridges = {}
+        for bridge in await self._client.async_get_bridges():
+            bridge_id = bridge.get("bridgeId")
+            if bridge_id:
+                bridges[bridge_id] = bridge
+        return bridges
 
-    async def _refresh_session(self) -> None:
-        """Refresh the session ID by re-authenticating."""
-        async with self._session.post(
-            f"{API_HOST}{API_AUTH_ENDPOINT}",
-            headers={
-                "Content-Type": "application/x-www-form-urlencoded;charset=UTF-8",
-                "User-Agent": USER_AGENT,
-                "Accept": "*/*",
-                "Accept-Language": "en-GB,en;q=0.9",
-                "Accept-Encoding": "gzip, deflate, br",
-            },
-            data={
-                "apiKey": API_KEY,
-                "username": self._username,
-                "password": self._password,
-            },
-        ) as response:
-            response.raise_for_status()
-            data = await response.json()
-            self._session_id = data["sessionId"]
+    async def _fetch_devices(self, bridge_id: str) -> dict[str, Any]:
+        """Fetch devices for a specific bridge."""
+        devices = {}
+        for device in await self._client.async_get_devices(bridge_id):
+            device_id = device.get("deviceId")
+            if device_id:
+                device["bridge_id"] = bridge_id
+                devices[device_id] = device
+        return devices
+
+    async def _fetch_live_data(
+        self,
+        device_id: str,
+        registers: list[int] = ALL_REGISTERS,
+    ) -> set[int]:
+        """Fetch live data for a specific device into its snapshot and return the changed registers."""
+        payload = await self._client.async_get_live_data(device_id, registers)
+        start = time.perf_counter()
+        changed = self._decoder.decode(payload, self._store.device(device_id), registers)
+        self.metrics.decode.record(time.perf_counter() - start)
+        return changed
 
     async def async_refresh_device(self, device_id: str) -> None:
         """Refresh live data for a specific device."""
+        await self._shared_task(
+            self._device_refreshes,
+            device_id,
+            partial(self._refresh_device, device_id),
+        )
+
+    async def _refresh_device(self, device_id: str) -> None:
+        """Fetch live data for a device and notify listeners."""
         try:
-            data = await self._fetch_live_data(device_id)
-            self.data["data"][device_id] = data
-            self.async_set_updated_data(self.data)
+            changed = await self._async_poll_device(device_id)
+            if changed is not None:
+                self._changed_keys = {(device_id, register) for register in changed}
+            self.async_set_updated_data(self._store)
         except Exception as error:
             _LOGGER.error("Error refreshing device %s: %s", device_id, error)
 
@@ -284,117 +577,103 @@ class MeltemCoordinator(DataUpdateCoordinator):
         if level not in VENTILATION_LEVELS:
             raise ValueError(f"Invalid ventilation level: {level}")
 
-        max_retries = 100
-        retry_count = 0
-        last_error = None
-
-        while retry_count < max_retries:
-            try:
-                headers = {
-                    **self._get_headers(),
-                    "Content-Type": "application/x-www-form-urlencoded;charset=UTF-8",
-                }
-                params = {
-                    "apiKey": API_KEY,
-                    "sessionId": self._session_id,
-                    "deviceId": device_id,
-                    "register": VENTILATION_REGISTER,
-                    "values": ",".join(str(v) for v in VENTILATION_LEVELS[level]),
-                }
-
-                async with async_timeout.timeout(10):
-                    async with self._session.post(
-                        f"{API_HOST}{API_SET_DATA_ENDPOINT}",
-                        headers=headers,
-                        data=params,
-                    ) as response:
-                        if response.status == 401:
-                            await self._refresh_session()
-                            params["sessionId"] = self._session_id
-                            async with self._session.post(
-                                f"{API_HOST}{API_SET_DATA_ENDPOINT}",
-                                headers=headers,
-                                data=params,
-                            ) as retry_response:
-                                retry_response.raise_for_status()
-                        else:
-                            response.raise_for_status()
-
-                        # If we get here, the request was successful
-                        # If switching to manual mode, set an initial speed
-                        if level == "manual":
-                            _LOGGER.debug("Setting initial manual speed to minimum value")
-                            await self.async_set_manual_speed(device_id, VENTILATION_MANUAL_MIN)
-                        else:
-                            # Refresh live data for this device
-                            await self.async_refresh_device(device_id)
-
-                        # Success - exit the retry loop
-                        return
-
-            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
-                last_error = error
-                retry_count += 1
-                if retry_count < max_retries:
-                    _LOGGER.warning(
-                        "Failed to set ventilation level (attempt %d/%d): %s. Retrying in 2 seconds...",
-                        retry_count,
-                        max_retries,
-                        error
-                    )
-                    await asyncio.sleep(2)
-                continue
+        # A new level supersedes speed changes that have not been sent or are being retried
+        if queue := self._command_queues.get(device_id):
+            await queue.async_cancel()
+
+        try:
+            await self._async_write(
+                device_id,
+                VENTILATION_REGISTER,
+                VENTILATION_LEVELS[level],
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError) as error:
+            raise UpdateFailed(f"Error setting ventilation level: {error}")
 
-        # If we get here, all retries failed
-        raise UpdateFailed(f"Error setting ventilation level after {max_retries} attempts: {last_error}")
+        # If switching to manual mode, set an initial speed
+        if level == "manual":
+            _LOGGER.debug("Setting initial manual speed to minimum value")
+            await self.async_set_manual_speed(device_id, VENTILATION_MANUAL_MIN)
+        else:
+            # Refresh live data for this device
+            await self.async_refresh_device(device_id)
 
     async def async_set_manual_speed(self, device_id: str, percentage: int) -> None:
         """Set the manual ventilation speed for a device."""
-        if not VENTILATION_MANUAL_MIN <= percentage <= VENTILATION_MANUAL_MAX:
-            raise ValueError(
-                f"Invalid ventilation speed percentage. Must be between "
-                f"{VENTILATION_MANUAL_MIN} and {VENTILATION_MANUAL_MAX}"
-            )
+        _validate_manual_speed(percentage)
 
         try:
-            headers = {
-                **self._get_headers(),
-                "Content-Type": "application/x-www-form-urlencoded;charset=UTF-8",
-            }
-            value = calculate_manual_value(percentage)
-            params = {
-                "apiKey": API_KEY,
-                "sessionId": self._session_id,
-                "deviceId": device_id,
-                "register": VENTILATION_MANUAL_REGISTER,
-                "values": str(value),
-            }
-
-            async with async_timeout.timeout(10):
-                async with self._session.post(
-                    f"{API_HOST}{API_SET_DATA_ENDPOINT}",
-                    headers=headers,
-                    data=params,
-                ) as response:
-                    if response.status == 401:
-                        await self._refresh_session()
-                        params["sessionId"] = self._session_id
-                        async with self._session.post(
-                            f"{API_HOST}{API_SET_DATA_ENDPOINT}",
-                            headers=headers,
-                            data=params,
-                        ) as retry_response:
-                            retry_response.raise_for_status()
-                    else:
-                        response.raise_for_status()
-
-                    # Refresh live data for this device
-                    await self.async_refresh_device(device_id)
-
-        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            await self._async_write_and_refresh(
+                device_id,
+                VENTILATION_MANUAL_REGISTER,
+                [calculate_manual_value(percentage)],
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError) as error:
             raise UpdateFailed(f"Error setting manual ventilation speed: {error}")
 
+    @callback
+    def async_queue_manual_speed(self, device_id: str, percentage: int) -> None:
+        """Queue a manual speed change and return without waiting for it.
+
+        Changes queued in quick succession, e.g. while dragging a slider, are
+        coalesced and only the latest speed is sent.
+        """
+        _validate_manual_speed(percentage)
+
+        if (queue := self._command_queues.get(device_id)) is None:
+            queue = self._command_queues[device_id] = DeviceCommandQueue(
+                self.hass,
+                device_id,
+                self._async_write_and_refresh,
+            )
+        queue.async_queue(VENTILATION_MANUAL_REGISTER, [calculate_manual_value(percentage)])
+
+    async def _async_write(self, device_id: str, register: int, values: list[int]) -> None:
+        """Write a device register, retrying transient failures."""
+
+        async def _send() -> None:
+            self._last_command[device_id] = self.hass.loop.time()
+            await self._client.async_set_register(device_id, register, values)
+
+        await self._retry_policy.async_call(
+            _send,
+            f"write register {register} of device {device_id}",
+        )
+
+        # Poll this device quickly while it responds to the command
+        self._scheduler.boost(device_id, self.hass.loop.time())
+
+    async def _async_write_and_refresh(
+        self,
+        device_id: str,
+        register: int,
+        values: list[int],
+    ) -> None:
+        """Write a device register and refresh the live data of the device."""
+        await self._async_write(device_id, register, values)
+        await self.async_refresh_device(device_id)
+
     async def async_close(self) -> None:
-        """Close the session."""
-        if self._session:
-            await self._session.close()
\ No newline at end of file
+        """Drop pending commands, cancel device polls, save the data and close the API client."""
+        for queue in self._command_queues.values():
+            queue.async_shutdown()
+        # Shared fetches outlive the callers that joined them, stop them before the client closes
+        tasks = [task for _, task in (*self._device_polls.values(), *self._device_refreshes.values())]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.profiler is not None:
+            # Write what was recorded so far
+            self.profiler.async_stop()
+        if self._persist is not None and self.data is not None:
+            await self._persist.async_save(self._store.as_dict())
+        await self._client.async_close()
+
+
+def _validate_manual_speed(percentage: int) -> None:
+    """Raise ValueError if a manual speed percentage is out of range."""
+    if not VENTILATION_MANUAL_MIN <= percentage <= VENTILATION_MANUAL_MAX:
+        raise ValueError(
+            f"Invalid ventilation speed percentage. Must be between "
+            f"{VENTILATION_MANUAL_MIN} and {VENTILATION_MANUAL_MAX}"
+        )
\ No newline at end of file
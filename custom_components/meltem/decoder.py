@@ -0,0 +1,112 @@
+"""Compiled decoder for Meltem live data responses."""
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+import logging
+from typing import Any, NamedTuple
+
+from homeassistant.util.json import json_loads
+
+from .const import LIVE_DATA_ERROR_STATUS, LIVE_DATA_INVALID_VALUE, LIVE_DATA_NAN
+from .snapshot import DeviceSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RegisterRule(NamedTuple):
+    """Validation rule of a register, compiled from its definition."""
+
+    index: int  # Column of the register in the snapshot store
+    max_value: float | None  # Values above this are invalid
+
+
+class LiveDataDecoder:
+    """Decode live data responses straight into device snapshots.
+
+    The rules of every known register are compiled once, so decoding an item
+    costs one table lookup and a few comparisons. Items whose lastUpdate is
+    not newer than the stored sample are skipped without validation.
+    """
+
+    def __init__(
+        self,
+        index: Mapping[int, int],
+        definitions: Mapping[int, Mapping[str, Any]],
+    ) -> None:
+        """Compile the rules for the registers of a snapshot store."""
+        self._rules: dict[int, RegisterRule] = {
+            register: RegisterRule(column, definitions.get(register, {}).get("max_value"))
+            for register, column in index.items()
+        }
+
+    def decode(
+        self,
+        payload: bytes,
+        snapshot: DeviceSnapshot,
+        registers: Iterable[int],
+    ) -> set[int]:
+        """Store the samples of a live data response in a device snapshot.
+
+        Requested registers without a valid sample are cleared. Returns the
+        registers whose value or status changed.
+        """
+        rules = self._rules
+        debug = _LOGGER.isEnabledFor(logging.DEBUG)
+        error_status = LIVE_DATA_ERROR_STATUS
+        nan = LIVE_DATA_NAN
+        invalid_value = LIVE_DATA_INVALID_VALUE
+        values = snapshot.values
+        statuses = snapshot.statuses
+        last_updates = snapshot.last_updates
+        present = snapshot.present
+        missing = set(registers)
+        changed: set[int] = set()
+
+        for item in json_loads(payload).get("data", ()):
+            address = item.get("address")
+            rule = rules.get(address)
+            if rule is None:
+                continue
+            index, max_value = rule
+
+            last_update = item.get("lastUpdate")
+            if last_update and present[index] and last_update <= last_updates[index]:
+                # No newer sample, or a late response to an earlier poll carrying an older one
+                missing.discard(address)
+                continue
+
+            status = item.get("status")
+            if status is not None:
+                if status == error_status:
+                    if debug:
+                        _LOGGER.debug("Register %s returned status code: %s", address, status)
+                    continue
+                value = None
+            else:
+                value = item.get("value")
+                if (
+                    value == nan
+                    or value == invalid_value
+                    or (
+                        max_value is not None
+                        and isinstance(value, (int, float))
+                        and value > max_value
+                    )
+                ):
+                    if debug:
+                        _LOGGER.debug("Register %s returned invalid value: %s", address, value)
+                    continue
+                status = 0
+
+            missing.discard(address)
+            if present[index] and values[index] == value and statuses[index] == status:
+                # Same sample as before, only its timestamp may have moved on
+                last_updates[index] = last_update or 0
+            elif snapshot.set(index, value, status, last_update):
+                changed.add(address)
+
+        for register in missing:
+            rule = rules.get(register)
+            if rule is not None and snapshot.clear(rule.index):
+                changed.add(register)
+        return changed
@@ -0,0 +1,39 @@
+"""Diagnostics support for the Meltem integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_PASSWORD, CONF_SESSION_ID, CONF_USERNAME
+from .coordinator import MeltemCoordinator
+
+TO_REDACT = {CONF_USERNAME, CONF_PASSWORD, CONF_SESSION_ID}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: MeltemCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "connection": {
+            "circuit_breaker": coordinator.circuit_breaker.state,
+            "consecutive_failures": coordinator.circuit_breaker.failures,
+            "stale": coordinator.stale,
+            "last_update_success": coordinator.last_update_success,
+        },
+        "metrics": coordinator.metrics.as_dict(),
+        "devices": {
+            device_id: {
+                "product_id": device.get("productId"),
+                "bridge_id": device.get("bridge_id"),
+                "sample_ages": coordinator.sample_ages(device_id),
+            }
+            for device_id, device in coordinator.data.devices.items()
+        },
+    }
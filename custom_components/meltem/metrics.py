@@ -0,0 +1,160 @@
+"""Request and update cycle metrics for the Meltem integration."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from typing import Any
+
+from .const import METRICS_LATENCY_BUCKETS
+
+
+class LatencyHistogram:
+    """Histogram of durations in seconds over fixed buckets.
+
+    Bucket i counts durations up to METRICS_LATENCY_BUCKETS[i], the last
+    bucket counts everything above the largest bound.
+    """
+
+    __slots__ = ("counts", "count", "total", "last", "max")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.counts = array("Q", bytes(8 * (len(METRICS_LATENCY_BUCKETS) + 1)))
+        self.count = 0
+        self.total = 0.0
+        self.last: float | None = None
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Add a duration."""
+        self.counts[bisect_left(METRICS_LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean duration, or None if nothing was recorded."""
+        return self.total / self.count if self.count else None
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the upper bound of the bucket holding the given fraction of durations.
+
+        The bound is capped at the longest recorded duration.
+        """
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(METRICS_LATENCY_BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram as a JSON serializable dict."""
+        bounds = [f"<={bound}" for bound in METRICS_LATENCY_BUCKETS]
+        bounds.append(f">{METRICS_LATENCY_BUCKETS[-1]}")
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "last": self.last,
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "buckets": dict(zip(bounds, self.counts)),
+        }
+
+
+class EndpointMetrics:
+    """Request counters and latency of one API endpoint."""
+
+    __slots__ = ("requests", "errors", "bytes_received", "latency")
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.requests = 0
+        self.errors = 0
+        self.bytes_received = 0
+        self.latency = LatencyHistogram()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a JSON serializable dict."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "bytes_received": self.bytes_received,
+            "latency": self.latency.as_dict(),
+        }
+
+
+class MeltemMetrics:
+    """Metrics of the API client and the update cycles of one account.
+
+    Durations are in seconds. Update cycles, live data decoding and listener
+    fan-out are recorded by the coordinator, requests by the API client.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.endpoints: dict[str, EndpointMetrics] = {}
+        self.reauthentications = 0
+        self.command_retries = 0
+        self.cycle = LatencyHistogram()
+        self.decode = LatencyHistogram()
+        self.fan_out = LatencyHistogram()
+
+    def endpoint(self, endpoint: str) -> EndpointMetrics:
+        """Return the metrics of an endpoint, e.g. "device/data/live"."""
+        name = endpoint.removeprefix("/v1/")
+        metrics = self.endpoints.get(name)
+        if metrics is None:
+            metrics = self.endpoints[name] = EndpointMetrics()
+        return metrics
+
+    def record_request(
+        self,
+        endpoint: str,
+        seconds: float,
+        size: int = 0,
+        failed: bool = False,
+    ) -> None:
+        """Record a request to an endpoint."""
+        metrics = self.endpoint(endpoint)
+        metrics.requests += 1
+        metrics.bytes_received += size
+        metrics.latency.record(seconds)
+        if failed:
+            metrics.errors += 1
+
+    def record_command_retry(self) -> None:
+        """Record a retried command."""
+        self.command_retries += 1
+
+    @property
+    def requests(self) -> int:
+        """Return the number of requests to all endpoints."""
+        return sum(metrics.requests for metrics in self.endpoints.values())
+
+    @property
+    def bytes_received(self) -> int:
+        """Return the number of response bytes from all endpoints."""
+        return sum(metrics.bytes_received for metrics in self.endpoints.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all metrics as a JSON serializable dict."""
+        return {
+            "requests": self.requests,
+            "bytes_received": self.bytes_received,
+            "reauthentications": self.reauthentications,
+            "command_retries": self.command_retries,
+            "endpoints": {
+                name: metrics.as_dict() for name, metrics in self.endpoints.items()
+            },
+            "cycle": self.cycle.as_dict(),
+            "decode": self.decode.as_dict(),
+            "fan_out": self.fan_out.as_dict(),
+        }
@@ -5,12 +5,14 @@ import logging
 
 from homeassistant.components.number import NumberEntity, NumberMode
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     DOMAIN,
+    SIGNAL_NEW_ENTITIES,
     VENTILATION_MANUAL_MIN,
     VENTILATION_MANUAL_MAX,
     VENTILATION_SPEED_REGISTER,
@@ -29,7 +31,7 @@ async def async_setup_entry(
     coordinator: MeltemCoordinator = hass.data[DOMAIN][entry.entry_id]
 
     entities = []
-    for device_id, device in coordinator.data["devices"].items():
+    for device_id, device in coordinator.data.devices.items():
         entities.append(
             MeltemManualSpeedControl(
                 coordinator,
@@ -40,6 +42,25 @@ async def async_setup_entry(
 
     async_add_entities(entities)
 
+    @callback
+    def _async_add_new_devices(
+        new_devices: list[str],
+        new_registers: dict[str, set[int]],
+    ) -> None:
+        """Add entities for devices that appeared after setup."""
+        async_add_entities(
+            MeltemManualSpeedControl(coordinator, device_id, coordinator.data.devices[device_id])
+            for device_id in new_devices
+        )
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_NEW_ENTITIES.format(entry.entry_id),
+            _async_add_new_devices,
+        )
+    )
+
 
 class MeltemManualSpeedControl(CoordinatorEntity, NumberEntity):
     """Representation of a Meltem manual ventilation speed control."""
@@ -51,7 +72,14 @@ class MeltemManualSpeedControl(CoordinatorEntity, NumberEntity):
         device_info: dict,
     ) -> None:
         """Initialize the number entity."""
-        super().__init__(coordinator)
+        # Only notified when the registers it displays change
+        super().__init__(
+            coordinator,
+            context=frozenset({
+                (device_id, VENTILATION_STATUS_REGISTER),
+                (device_id, VENTILATION_SPEED_REGISTER),
+            }),
+        )
         self._device_id = device_id
         self._device_info = device_info
 
@@ -82,29 +110,28 @@ class MeltemManualSpeedControl(CoordinatorEntity, NumberEntity):
         if not self.coordinator.last_update_success:
             return False
 
-        device_data = self.coordinator.data["data"].get(self._device_id, {})
-        status_data = device_data.get(VENTILATION_STATUS_REGISTER)
-
-        if not status_data or "value" not in status_data:
+        if not self.coordinator.data.has(self._device_id, VENTILATION_STATUS_REGISTER):
             return False
 
         # Available as long as we have valid status data
         return True
 
+    @property
+    def extra_state_attributes(self) -> dict[str, bool]:
+        """Return whether the last known data is shown while the API is unavailable."""
+        return {"stale": self.coordinator.stale}
+
     @property
     def native_value(self) -> float | None:
         """Return the current ventilation speed percentage."""
-        if not self.coordinator.data or not self.coordinator.data.get("data"):
+        if not self.coordinator.data:
             return None
 
-        device_data = self.coordinator.data["data"].get(self._device_id, {})
-        speed_data = device_data.get(VENTILATION_SPEED_REGISTER)
+        value = self.coordinator.data.value(self._device_id, VENTILATION_SPEED_REGISTER)
 
-        if not speed_data or "value" not in speed_data:
+        if value is None:
             return None
 
-        value = speed_data.get("value")
-
         # Convert register value to percentage
         if value == 0:
             return 0
@@ -112,4 +139,5 @@ class MeltemManualSpeedControl(CoordinatorEntity, NumberEntity):
 
     async def async_set_native_value(self, value: float) -> None:
         """Set the manual speed percentage."""
-        await self.coordinator.async_set_manual_speed(self._device_id, int(value))
\ No newline at end of file
+        # Queued so that dragging the slider only sends the final speed
+        self.coordinator.async_queue_manual_speed(self._device_id, int(value))
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""On-demand profiling of the Meltem coordinators."""
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import pstats
+import tracemalloc
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import PROFILE_TOP_ENTRIES
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CycleProfiler:
+    """Profile the event loop thread over a number of coordinator update cycles.
+
+    Everything running on the loop while the profiler is active is recorded,
+    including commands, live data decoding and entity state writes. The
+    profile ends after the given number of update cycles, counted over all
+    coordinators it is attached to.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        cycles: int,
+        trace_memory: bool = False,
+    ) -> None:
+        """Initialize the profiler."""
+        self._hass = hass
+        self._remaining = cycles
+        self._cycles = cycles
+        self._trace_memory = trace_memory
+        self._profile = cProfile.Profile()
+        self._started_tracemalloc = False
+        self.active = False
+
+    @callback
+    def async_start(self) -> None:
+        """Start recording."""
+        if self._trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self.active = True
+        self._profile.enable()
+
+    @callback
+    def async_cycle_done(self) -> None:
+        """Count a finished update cycle and stop once enough were recorded."""
+        if not self.active:
+            return
+        self._remaining -= 1
+        if self._remaining <= 0:
+            # Stop on the next loop iteration so the entity updates of this cycle are included
+            self._hass.loop.call_soon(self.async_stop)
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop recording and write the results to the config directory."""
+        if not self.active:
+            return
+        self.active = False
+        self._profile.disable()
+
+        memory = None
+        if self._trace_memory and tracemalloc.is_tracing():
+            memory = tracemalloc.take_snapshot()
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+
+        name = f"meltem_profile_{dt_util.utcnow().strftime('%Y%m%d_%H%M%S')}"
+        self._hass.async_add_executor_job(self._write, name, memory)
+
+    def _write(self, name: str, memory: tracemalloc.Snapshot | None) -> None:
+        """Write the profile and the report of the top entries."""
+        stats_path = self._hass.config.path(f"{name}.prof")
+        report_path = self._hass.config.path(f"{name}.txt")
+        self._profile.dump_stats(stats_path)
+
+        stream = io.StringIO()
+        stream.write(f"Meltem profile over {self._cycles} update cycle(s)\n\n")
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_TOP_ENTRIES)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(PROFILE_TOP_ENTRIES)
+
+        if memory is not None:
+            stream.write("Top allocation sites\n\n")
+            for statistic in memory.statistics("lineno")[:PROFILE_TOP_ENTRIES]:
+                stream.write(f"{statistic}\n")
+
+        with open(report_path, "w", encoding="utf-8") as report:
+            report.write(stream.getvalue())
+        _LOGGER.info("Wrote Meltem profile to %s and %s", report_path, stats_path)
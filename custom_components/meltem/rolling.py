@@ -0,0 +1,258 @@
+"""Rolling statistics of register values for the Meltem integration."""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Callable, Iterable
+import math
+from typing import Any
+
+from .snapshot import SnapshotStore
+
+
+class _MonotonicQueue:
+    """Ring of bucket positions whose values are monotonic from front to back."""
+
+    __slots__ = ("_positions", "_head", "size")
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize an empty queue for up to capacity positions."""
+        self._positions = array("I", bytes(4 * capacity))
+        self._head = 0
+        self.size = 0
+
+    def front(self) -> int:
+        """Return the oldest position."""
+        return self._positions[self._head]
+
+    def back(self) -> int:
+        """Return the newest position."""
+        return self._positions[(self._head + self.size - 1) % len(self._positions)]
+
+    def push_back(self, position: int) -> None:
+        """Append a position."""
+        self._positions[(self._head + self.size) % len(self._positions)] = position
+        self.size += 1
+
+    def pop_back(self) -> None:
+        """Remove the newest position."""
+        self.size -= 1
+
+    def pop_front(self) -> None:
+        """Remove the oldest position."""
+        self._head = (self._head + 1) % len(self._positions)
+        self.size -= 1
+
+
+class RollingWindow:
+    """Samples of one register over a time window with O(1) min, max and mean.
+
+    Samples are aggregated into buckets of resolution seconds, kept in
+    preallocated arrays used as a ring buffer, so a window holds at most
+    window / resolution + 1 buckets however often it is sampled. The sum
+    and sample count are updated as buckets enter and leave the window, and
+    the minimum and maximum are the front of two monotonic queues of bucket
+    positions. Buckets leave the window whole, so its start is accurate to
+    the resolution.
+    """
+
+    __slots__ = (
+        "window",
+        "resolution",
+        "_times",
+        "_mins",
+        "_maxs",
+        "_sums",
+        "_counts",
+        "_start",
+        "_buckets",
+        "count",
+        "_sum",
+        "_min",
+        "_max",
+        "last_update",
+    )
+
+    def __init__(self, window: float, resolution: float) -> None:
+        """Initialize an empty window."""
+        capacity = math.ceil(window / resolution) + 1
+        self.window = window
+        self.resolution = resolution
+        self._times = array("d", bytes(8 * capacity))  # Time of the first sample of each bucket
+        self._mins = array("d", bytes(8 * capacity))
+        self._maxs = array("d", bytes(8 * capacity))
+        self._sums = array("d", bytes(8 * capacity))
+        self._counts = array("I", bytes(4 * capacity))
+        self._start = 0  # Ring position of the oldest bucket
+        self._buckets = 0
+        self.count = 0  # Samples in the window
+        self._sum = 0.0
+        self._min = _MonotonicQueue(capacity)  # Increasing bucket minimums
+        self._max = _MonotonicQueue(capacity)  # Decreasing bucket maximums
+        self.last_update = 0  # Cloud timestamp of the newest sample, 0 if unknown
+
+    def add(self, time: float, value: float) -> None:
+        """Add a sample taken at the given time, in seconds."""
+        capacity = len(self._times)
+        self.expire(time)
+        position = (self._start + self._buckets - 1) % capacity
+        if not self._buckets or time - self._times[position] >= self.resolution:
+            if self._buckets == capacity:
+                self._pop_oldest()
+            position = (self._start + self._buckets) % capacity
+            self._times[position] = time
+            self._mins[position] = self._maxs[position] = value
+            self._sums[position] = 0.0
+            self._counts[position] = 0
+            self._buckets += 1
+
+        self._sums[position] += value
+        self._counts[position] += 1
+        self._sum += value
+        self.count += 1
+
+        # The newest bucket's minimum only decreases and its maximum only
+        # increases, so re-pushing it keeps both queues monotonic
+        mins = self._mins
+        if value < mins[position]:
+            mins[position] = value
+        while self._min.size and mins[self._min.back()] >= mins[position]:
+            self._min.pop_back()
+        self._min.push_back(position)
+
+        maxs = self._maxs
+        if value > maxs[position]:
+            maxs[position] = value
+        while self._max.size and maxs[self._max.back()] <= maxs[position]:
+            self._max.pop_back()
+        self._max.push_back(position)
+
+    def expire(self, now: float) -> None:
+        """Drop the buckets that started before the window."""
+        cutoff = now - self.window
+        while self._buckets and self._times[self._start] <= cutoff:
+            self._pop_oldest()
+
+    @property
+    def min(self) -> float | None:
+        """Return the smallest value in the window."""
+        return self._mins[self._min.front()] if self.count else None
+
+    @property
+    def max(self) -> float | None:
+        """Return the largest value in the window."""
+        return self._maxs[self._max.front()] if self.count else None
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean of the samples in the window."""
+        return self._sum / self.count if self.count else None
+
+    def _pop_oldest(self) -> None:
+        """Remove the oldest bucket."""
+        position = self._start
+        if self._min.front() == position:
+            self._min.pop_front()
+        if self._max.front() == position:
+            self._max.pop_front()
+        self._sum -= self._sums[position]
+        self.count -= self._counts[position]
+        self._start = (position + 1) % len(self._times)
+        self._buckets -= 1
+        if self._start == 0:
+            # Recompute the sum once per pass over the ring so rounding errors do not build up
+            capacity = len(self._times)
+            self._sum = sum(
+                self._sums[(self._start + i) % capacity] for i in range(self._buckets)
+            )
+
+
+class RegisterStatistics:
+    """Rolling windows of the numeric registers of all devices.
+
+    Windows are created on the first sample of a register and hold values
+    in the units of the register's sensor.
+    """
+
+    __slots__ = ("window", "resolution", "_converters", "_windows")
+
+    def __init__(
+        self,
+        converters: dict[int, Callable[[Any], Any] | None],
+        window: float,
+        resolution: float,
+    ) -> None:
+        """Initialize the statistics for the registers in converters.
+
+        converters maps each register to the function converting its raw
+        value, or to None if the raw value is used as is.
+        """
+        self.window = window
+        self.resolution = resolution
+        self._converters = converters
+        self._windows: dict[str, dict[int, RollingWindow]] = {}
+
+    @property
+    def registers(self) -> Iterable[int]:
+        """Return the registers with statistics."""
+        return self._converters.keys()
+
+    def record(
+        self,
+        device_id: str,
+        store: SnapshotStore,
+        registers: Iterable[int],
+        now: float,
+    ) -> None:
+        """Add the current values of the given registers of a device.
+
+        Registers without a numeric value or with an error status are skipped,
+        as are samples whose cloud timestamp was already recorded, so polling
+        faster does not weigh a sample more.
+        """
+        snapshot = store.device(device_id)
+        index = store.index
+        windows = self._windows.get(device_id)
+        for register in registers:
+            if register not in self._converters:
+                continue
+            column = index[register]
+            value = snapshot.values[column]
+            if (
+                not snapshot.present[column]
+                or snapshot.statuses[column]
+                or not isinstance(value, (int, float))
+            ):
+                continue
+            if windows is None:
+                windows = self._windows[device_id] = {}
+            window = windows.get(register)
+            if window is None:
+                window = windows[register] = RollingWindow(self.window, self.resolution)
+            last_update = snapshot.last_updates[column]
+            if last_update and last_update == window.last_update:
+                continue
+            if (convert := self._converters[register]) is not None:
+                value = convert(value)
+            window.add(now, value)
+            window.last_update = last_update
+
+    def summary(self, device_id: str, register: int, now: float) -> dict[str, Any] | None:
+        """Return the min, max, mean and sample count of a register, or None without samples."""
+        window = self._windows.get(device_id, {}).get(register)
+        if window is None:
+            return None
+        window.expire(now)
+        if not window.count:
+            return None
+        return {
+            "min": window.min,
+            "max": window.max,
+            "mean": window.mean,
+            "samples": window.count,
+        }
+
+    def retain_devices(self, device_ids: Iterable[str]) -> None:
+        """Drop the windows of all devices not in device_ids."""
+        keep = set(device_ids)
+        for device_id in self._windows.keys() - keep:
+            del self._windows[device_id]
@@ -0,0 +1,113 @@
+"""Adaptive per-device polling schedule for the Meltem integration."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+import random
+
+from .const import (
+    POLL_INTERVAL_MIN,
+    POLL_INTERVAL_MAX,
+    POLL_BACKOFF_FACTOR,
+    POLL_BOOST_DURATION,
+    POLL_JITTER,
+    ADAPTIVE_POLL_REGISTERS,
+)
+
+
+@dataclass
+class _DeviceSchedule:
+    """Polling state of a single device."""
+
+    interval: float
+    next_poll: float
+    boost_until: float = 0.0
+
+
+class DevicePollScheduler:
+    """Decide which devices are due for a live data poll.
+
+    Each device starts at the minimum interval. While the watched registers
+    stay flat the interval grows exponentially up to the maximum; a change of
+    their values or a recent set command drops it back to the minimum. Poll times are jittered
+    so devices that backed off together do not stay in lockstep.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = POLL_INTERVAL_MIN,
+        max_interval: float = POLL_INTERVAL_MAX,
+        backoff_factor: float = POLL_BACKOFF_FACTOR,
+        boost_duration: float = POLL_BOOST_DURATION,
+        jitter: float = POLL_JITTER,
+    ) -> None:
+        """Initialize the scheduler."""
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._backoff_factor = backoff_factor
+        self._boost_duration = boost_duration
+        self._jitter = jitter
+        self._schedules: dict[str, _DeviceSchedule] = {}
+
+    def due_devices(self, device_ids: Iterable[str], now: float) -> list[str]:
+        """Return the devices that should be polled at loop time `now`."""
+        device_ids = list(device_ids)
+
+        # Forget devices that are no longer part of the topology
+        for device_id in self._schedules.keys() - set(device_ids):
+            del self._schedules[device_id]
+
+        due = []
+        for device_id in device_ids:
+            schedule = self._schedules.get(device_id)
+            if schedule is None or schedule.next_poll <= now:
+                due.append(device_id)
+        return due
+
+    def record_poll(
+        self,
+        device_id: str,
+        now: float,
+        changed: set[int] | None,
+    ) -> None:
+        """Schedule the next poll of a device based on which registers changed.
+
+        changed holds the registers whose value moved from one sample to
+        another, or is None if nothing was known about the device before.
+        """
+        schedule = self._schedules.get(device_id)
+        if schedule is None:
+            schedule = self._schedules[device_id] = _DeviceSchedule(
+                interval=self._min_interval,
+                next_poll=now,
+            )
+        elif (
+            now < schedule.boost_until
+            or changed is None
+            or not changed.isdisjoint(ADAPTIVE_POLL_REGISTERS)
+        ):
+            schedule.interval = self._min_interval
+        else:
+            schedule.interval = min(
+                schedule.interval * self._backoff_factor,
+                self._max_interval,
+            )
+
+        # Spread polls over the interval instead of firing all devices at once
+        schedule.next_poll = now + schedule.interval * random.uniform(
+            1 - self._jitter, 1
+        )
+
+    def boost(self, device_id: str, now: float) -> None:
+        """Poll a device at the minimum interval for a while, e.g. after a command."""
+        schedule = self._schedules.get(device_id)
+        if schedule is None:
+            return
+        schedule.boost_until = now + self._boost_duration
+        schedule.interval = self._min_interval
+        schedule.next_poll = now
+
+    def interval(self, device_id: str) -> float | None:
+        """Return the current polling interval of a device."""
+        schedule = self._schedules.get(device_id)
+        return schedule.interval if schedule else None
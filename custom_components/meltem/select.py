@@ -3,12 +3,14 @@ from __future__ import annotations
 
 from homeassistant.components.select import SelectEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     DOMAIN,
+    SIGNAL_NEW_ENTITIES,
     VENTILATION_LEVELS,
     VENTILATION_STATUS_REGISTER,
     VENTILATION_VALUE_MAP,
@@ -24,7 +26,7 @@ async def async_setup_entry(
     coordinator: MeltemCoordinator = hass.data[DOMAIN][entry.entry_id]
 
     entities = []
-    for device_id, device in coordinator.data["devices"].items():
+    for device_id, device in coordinator.data.devices.items():
         entities.append(
             MeltemVentilationLevelSelect(
                 coordinator,
@@ -35,6 +37,25 @@ async def async_setup_entry(
 
     async_add_entities(entities)
 
+    @callback
+    def _async_add_new_devices(
+        new_devices: list[str],
+        new_registers: dict[str, set[int]],
+    ) -> None:
+        """Add entities for devices that appeared after setup."""
+        async_add_entities(
+            MeltemVentilationLevelSelect(coordinator, device_id, coordinator.data.devices[device_id])
+            for device_id in new_devices
+        )
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_NEW_ENTITIES.format(entry.entry_id),
+            _async_add_new_devices,
+        )
+    )
+
 
 class MeltemVentilationLevelSelect(CoordinatorEntity, SelectEntity):
     """Representation of a Meltem ventilation level select."""
@@ -46,7 +67,11 @@ class MeltemVentilationLevelSelect(CoordinatorEntity, SelectEntity):
         device_info: dict,
     ) -> None:
         """Initialize the select entity."""
-        super().__init__(coordinator)
+        # Only notified when the register it displays changes
+        super().__init__(
+            coordinator,
+            context=frozenset({(device_id, VENTILATION_STATUS_REGISTER)}),
+        )
         self._device_id = device_id
         self._device_info = device_info
 
@@ -70,19 +95,18 @@ class MeltemVentilationLevelSelect(CoordinatorEntity, SelectEntity):
     @property
     def current_option(self) -> str | None:
         """Return the current ventilation level."""
-        if not self.coordinator.data or not self.coordinator.data.get("data"):
+        if not self.coordinator.data:
             return None
 
-        device_data = self.coordinator.data["data"].get(self._device_id, {})
-        register_data = device_data.get(VENTILATION_STATUS_REGISTER)
-
-        if not register_data or "value" not in register_data:
-            return None
-
-        value = register_data.get("value")
+        value = self.coordinator.data.value(self._device_id, VENTILATION_STATUS_REGISTER)
         level = VENTILATION_VALUE_MAP.get(value)
         return level.capitalize() if level else None
 
+    @property
+    def extra_state_attributes(self) -> dict[str, bool]:
+        """Return whether the last known data is shown while the API is unavailable."""
+        return {"stale": self.coordinator.stale}
+
     async def async_select_option(self, option: str) -> None:
         """Set the ventilation level."""
         await self.coordinator.async_set_ventilation_level(self._device_id, option.lower())
\ No newline at end of file
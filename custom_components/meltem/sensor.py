@@ -1,7 +1,9 @@
 """Support for Meltem sensors."""
 from __future__ import annotations
 
+from collections.abc import Callable
 import logging
+from typing import Any
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -9,36 +11,137 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     DOMAIN,
+    CIRCUIT_CLOSED,
+    CIRCUIT_OPEN,
+    CIRCUIT_HALF_OPEN,
     REGISTER_DEFINITIONS,
     ADDITIONAL_REGISTERS,
+    LIVE_DATA_ERROR_STATUS,
+    LIVE_DATA_NAN,
+    SIGNAL_NEW_ENTITIES,
+    STATISTICS_WINDOW,
     convert_voc_ppm_to_ugm3,
 )
-from .coordinator import MeltemCoordinator
+from .coordinator import STATISTICS_CONVERTERS, STATISTICS_UNIQUE_ID_SUFFIX, MeltemCoordinator
+from .metrics import LatencyHistogram, MeltemMetrics
 
 _LOGGER = logging.getLogger(__name__)
 ALL_REGISTERS = {**REGISTER_DEFINITIONS, **ADDITIONAL_REGISTERS}
 
-async def async_setup_entry(
-    hass: HomeAssistant,
-    entry: ConfigEntry,
-    async_add_entities: AddEntitiesCallback,
-) -> None:
-    """Set up the Meltem sensors."""
-    coordinator: MeltemCoordinator = hass.data[DOMAIN][entry.entry_id]
-
-    entities = []
-
-    # Create entities for each device and register
-    for device_id, device in coordinator.data["devices"].items():
+VOC_REGISTER = 41013  # Supply Air VOC, reported in ppm
+
+# Returned by the snapshot store for registers without a sample
+_MISSING = object()
+
+
+def _milliseconds(seconds: float | None) -> float | None:
+    """Convert a duration in seconds to milliseconds."""
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def _latency_attributes(histogram: LatencyHistogram) -> dict[str, Any]:
+    """Return the summary of a latency histogram in milliseconds."""
+    return {
+        "count": histogram.count,
+        "mean": _milliseconds(histogram.mean),
+        "p50": _milliseconds(histogram.percentile(0.5)),
+        "p95": _milliseconds(histogram.percentile(0.95)),
+        "max": _milliseconds(histogram.max),
+    }
+
+
+# Diagnostic sensors for the request and update cycle metrics, disabled by default
+METRIC_SENSORS = {
+    "cycle_duration": {
+        "name": "Poll Cycle Duration",
+        "unit": UnitOfTime.MILLISECONDS,
+        "device_class": SensorDeviceClass.DURATION,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:timer-outline",
+        "value": lambda metrics: _milliseconds(metrics.cycle.last),
+        "attributes": lambda metrics: {
+            **_latency_attributes(metrics.cycle),
+            "decode": _latency_attributes(metrics.decode),
+            "fan_out": _latency_attributes(metrics.fan_out),
+        },
+    },
+    "live_data_latency": {
+        "name": "Live Data Latency",
+        "unit": UnitOfTime.MILLISECONDS,
+        "device_class": SensorDeviceClass.DURATION,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:timer-sand",
+        "value": lambda metrics: _milliseconds(
+            metrics.endpoint("device/data/live").latency.last
+        ),
+        "attributes": lambda metrics: _latency_attributes(
+            metrics.endpoint("device/data/live").latency
+        ),
+    },
+    "command_latency": {
+        "name": "Command Latency",
+        "unit": UnitOfTime.MILLISECONDS,
+        "device_class": SensorDeviceClass.DURATION,
+        "state_class": SensorStateClass.MEASUREMENT,
+        "icon": "mdi:timer-sand",
+        "value": lambda metrics: _milliseconds(
+            metrics.endpoint("device/data/set").latency.last
+        ),
+        "attributes": lambda metrics: _latency_attributes(
+            metrics.endpoint("device/data/set").latency
+        ),
+    },
+    "api_requests": {
+        "name": "API Requests",
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+        "icon": "mdi:swap-vertical",
+        "value": lambda metrics: metrics.requests,
+        "attributes": lambda metrics: {
+            name: endpoint.requests for name, endpoint in metrics.endpoints.items()
+        },
+    },
+    "api_data_received": {
+        "name": "API Data Received",
+        "unit": UnitOfInformation.BYTES,
+        "device_class": SensorDeviceClass.DATA_SIZE,
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+        "icon": "mdi:download-network",
+        "value": lambda metrics: metrics.bytes_received,
+    },
+    "reauthentications": {
+        "name": "Re-authentications",
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+        "icon": "mdi:account-key",
+        "value": lambda metrics: metrics.reauthentications,
+    },
+    "command_retries": {
+        "name": "Command Retries",
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+        "icon": "mdi:refresh",
+        "value": lambda metrics: metrics.command_retries,
+    },
+}
+
+def _register_sensors(
+    coordinator: MeltemCoordinator,
+    registers: dict[str, set[int]],
+) -> list[SensorEntity]:
+    """Create the sensors for the given registers of each device."""
+    entities: list[SensorEntity] = []
+    for device_id, device_registers in registers.items():
+        device = coordinator.data.devices[device_id]
         for register_id, register_info in ALL_REGISTERS.items():
-            if register_id in coordinator.data["data"].get(device_id, {}):
+            if register_id in device_registers:
                 try:
                     # Convert entity_category string to enum if present
                     if "entity_category" in register_info:
@@ -56,6 +159,15 @@ async def async_setup_entry(
                             device,
                         )
                     )
+                    if register_id in STATISTICS_CONVERTERS:
+                        entities.append(
+                            MeltemStatisticsSensor(
+                                coordinator,
+                                device_id,
+                                register_id,
+                                register_info,
+                            )
+                        )
                 except ValueError as err:
                     _LOGGER.error(
                         "Error creating sensor for register %s: %s",
@@ -63,16 +175,57 @@ async def async_setup_entry(
                         err
                     )
                     continue
+    return entities
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the Meltem sensors."""
+    coordinator: MeltemCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    # Create entities for each device and register
+    entities = _register_sensors(
+        coordinator,
+        {
+            device_id: set(coordinator.data.registers(device_id))
+            for device_id in coordinator.data.devices
+        },
+    )
 
     if not entities:
         _LOGGER.warning(
             "No valid sensors were created for device(s): %s",
-            ", ".join(coordinator.data["devices"].keys())
+            ", ".join(coordinator.data.devices.keys())
         )
-        return
+
+    # Diagnostic sensors for the connection to the cloud API
+    entities.append(MeltemCircuitBreakerSensor(coordinator, entry))
+    entities.extend(
+        MeltemMetricSensor(coordinator, entry, key, description)
+        for key, description in METRIC_SENSORS.items()
+    )
 
     async_add_entities(entities)
 
+    @callback
+    def _async_add_new_registers(
+        new_devices: list[str],
+        new_registers: dict[str, set[int]],
+    ) -> None:
+        """Add sensors for registers that reported data for the first time."""
+        async_add_entities(_register_sensors(coordinator, new_registers))
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_NEW_ENTITIES.format(entry.entry_id),
+            _async_add_new_registers,
+        )
+    )
+
 
 class MeltemSensor(CoordinatorEntity, SensorEntity):
     """Representation of a Meltem sensor."""
@@ -86,7 +239,8 @@ class MeltemSensor(CoordinatorEntity, SensorEntity):
         device: dict,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        # Only notified when the register it displays changes
+        super().__init__(coordinator, context=frozenset({(device_id, register_id)}))
 
         # Validate required attributes
         if not register_info.get("name"):
@@ -110,6 +264,9 @@ class MeltemSensor(CoordinatorEntity, SensorEntity):
         self._attr_entity_category = register_info.get("entity_category")
         self._attr_suggested_display_precision = register_info.get("suggested_display_precision")
 
+        # Raw register value to state, compiled once instead of on every state write
+        self._convert = _compile_value_pipeline(register_id, register_info)
+
         # Link to device
         device_name = device.get("name")
         if not device_name:
@@ -131,99 +288,238 @@ class MeltemSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self) -> str | int | float | None:
         """Return the state of the sensor."""
-        if not self.coordinator.data or not self.coordinator.data.get("data"):
+        if not self.coordinator.data:
+            return None
+
+        value = self.coordinator.data.value(self._device_id, self._register_id)
+        state = self._convert(value)
+        if _LOGGER.isEnabledFor(logging.DEBUG):
             _LOGGER.debug(
-                "No data available for sensor %s (register %s)",
+                "Value of sensor %s (register %s): %s -> %s",
                 self._attr_name,
                 self._register_id,
+                value,
+                state,
             )
-            return None
+        return state
 
-        device_data = self.coordinator.data["data"].get(self._device_id, {})
-        register_data = device_data.get(self._register_id)
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        if not self.coordinator.last_update_success:
+            return False
 
-        _LOGGER.debug(
-            "Raw data for sensor %s (register %s): %s",
-            self._attr_name,
-            self._register_id,
-            register_data,
-        )
+        # Consider the entity unavailable without a sample or if the value is NaN or 1001
+        value = self.coordinator.data.get(self._device_id, self._register_id, _MISSING)
+        return value is not _MISSING and value != LIVE_DATA_NAN and value != LIVE_DATA_ERROR_STATUS
 
-        if not register_data or "value" not in register_data:
+    @property
+    def extra_state_attributes(self) -> dict[str, bool]:
+        """Return whether the last known data is shown while the API is unavailable."""
+        return {"stale": self.coordinator.stale}
+
+
+def _compile_value_pipeline(
+    register_id: int,
+    register_info: dict,
+) -> Callable[[Any], Any]:
+    """Return a function that converts a raw register value into a sensor state.
+
+    Covers the error sentinel, the VOC ppm to µg/m³ conversion and the
+    value_map or value_transform of the register definition.
+    """
+    name = register_info["name"]
+    value_map = register_info.get("value_map")
+    value_transform = register_info.get("value_transform")
+
+    if (
+        register_id == VOC_REGISTER
+        and register_info.get("device_class") == SensorDeviceClass.VOLATILE_ORGANIC_COMPOUNDS
+    ):
+        def convert(value: Any) -> Any:
+            if isinstance(value, (int, float)):
+                return convert_voc_ppm_to_ugm3(float(value))
+            return value
+    elif value_map is not None:
+        def convert(value: Any) -> Any:
+            return value_map.get(value, value)
+    elif callable(value_transform):
+        convert = value_transform
+    else:
+        convert = None
+
+    def pipeline(value: Any) -> Any:
+        if value is None:
             return None
-
-        value = register_data["value"]
-
-        # Check for error values
-        if value == 1001:
+        if value == LIVE_DATA_ERROR_STATUS:
             _LOGGER.warning(
                 "Received error value 1001 for sensor %s (register %s). This might indicate a communication error or invalid reading.",
-                self._attr_name,
-                self._register_id,
+                name,
+                register_id,
             )
             return None
+        return convert(value) if convert is not None else value
 
-        # Convert VOC values from ppm to µg/m³
-        if (
-            self._register_id == 41013  # Supply Air VOC register
-            and self._attr_device_class == "volatile_organic_compounds"
-            and isinstance(value, (int, float))
-        ):
-            converted_value = convert_voc_ppm_to_ugm3(float(value))
-            _LOGGER.debug(
-                "Converted VOC value for sensor %s: %s ppm -> %s µg/m³",
-                self._attr_name,
-                value,
-                converted_value,
-            )
-            return converted_value
+    return pipeline
 
-        # Handle value mapping if defined
-        if "value_map" in self._register_info:
-            mapped_value = self._register_info["value_map"].get(value, value)
-            _LOGGER.debug(
-                "Mapped value for sensor %s: %s -> %s",
-                self._attr_name,
-                value,
-                mapped_value,
-            )
-            return mapped_value
 
-        # Handle value transformation if defined
-        if "value_transform" in self._register_info and callable(self._register_info["value_transform"]):
-            transformed_value = self._register_info["value_transform"](value)
-            _LOGGER.debug(
-                "Transformed value for sensor %s: %s -> %s",
-                self._attr_name,
-                value,
-                transformed_value,
-            )
-            return transformed_value
+class MeltemStatisticsSensor(CoordinatorEntity, SensorEntity):
+    """Mean of a register over the statistics window, with its min and max as attributes."""
 
-        return value
+    def __init__(
+        self,
+        coordinator: MeltemCoordinator,
+        device_id: str,
+        register_id: int,
+        register_info: dict,
+    ) -> None:
+        """Initialize the sensor."""
+        # Notified on every update, the window moves on even while the value stays the same
+        super().__init__(coordinator)
+
+        self._device_id = device_id
+        self._register_id = register_id
+
+        # Entity properties
+        self._attr_name = f"{register_info['name']} {STATISTICS_WINDOW // 60} min Average"
+        self._attr_unique_id = f"{device_id}_{register_id}{STATISTICS_UNIQUE_ID_SUFFIX}"
+        self._attr_native_unit_of_measurement = register_info.get("unit")
+        self._attr_device_class = register_info.get("device_class")
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_icon = "mdi:chart-bell-curve-cumulative"
+        self._attr_has_entity_name = True
+        self._attr_should_poll = False
+        self._attr_entity_registry_enabled_default = False
+        self._attr_suggested_display_precision = register_info.get("suggested_display_precision")
+        self._attr_device_info = {"identifiers": {(DOMAIN, device_id)}}
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the mean over the window."""
+        summary = self.coordinator.register_statistics(self._device_id, self._register_id)
+        return None if summary is None else summary["mean"]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the min, max and number of samples over the window."""
+        summary = self.coordinator.register_statistics(self._device_id, self._register_id)
+        if summary is None:
+            return {}
+        return {
+            "min": summary["min"],
+            "max": summary["max"],
+            "samples": summary["samples"],
+            "window": STATISTICS_WINDOW,
+        }
 
     @property
     def available(self) -> bool:
         """Return if entity is available."""
-        if not self.coordinator.last_update_success:
-            return False
+        return (
+            self.coordinator.last_update_success
+            and self.coordinator.register_statistics(self._device_id, self._register_id)
+            is not None
+        )
 
-        device_data = self.coordinator.data["data"].get(self._device_id, {})
-        register_data = device_data.get(self._register_id)
 
-        if not register_data:
-            return False
+class MeltemCircuitBreakerSensor(CoordinatorEntity, SensorEntity):
+    """Representation of the circuit breaker guarding the Meltem cloud API."""
 
-        value = register_data.get("value")
+    def __init__(
+        self,
+        coordinator: MeltemCoordinator,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
 
-        # Consider the entity unavailable if the value is NaN or 1001
-        if value in ["NaN", 1001]:
-            _LOGGER.debug(
-                "Sensor %s (register %s) is unavailable due to value: %s",
-                self._attr_name,
-                self._register_id,
-                value,
-            )
-            return False
+        # Entity properties
+        self._attr_name = "API Connection"
+        self._attr_unique_id = f"{entry.entry_id}_circuit_breaker"
+        self._attr_device_class = SensorDeviceClass.ENUM
+        self._attr_options = [CIRCUIT_CLOSED, CIRCUIT_OPEN, CIRCUIT_HALF_OPEN]
+        self._attr_icon = "mdi:cloud-check"
+        self._attr_has_entity_name = True
+        self._attr_should_poll = False
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+
+        self._attr_device_info = _cloud_device_info(entry)
 
-        return True
\ No newline at end of file
+    @property
+    def native_value(self) -> str:
+        """Return the state of the circuit breaker."""
+        return self.coordinator.circuit_breaker.state
+
+    @property
+    def extra_state_attributes(self) -> dict[str, int | bool]:
+        """Return the failure count and whether stale data is being served."""
+        return {
+            "consecutive_failures": self.coordinator.circuit_breaker.failures,
+            "stale": self.coordinator.stale,
+        }
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        # Reports the connection state even while updates are failing
+        return True
+
+
+class MeltemMetricSensor(CoordinatorEntity, SensorEntity):
+    """Representation of a request or update cycle metric."""
+
+    def __init__(
+        self,
+        coordinator: MeltemCoordinator,
+        entry: ConfigEntry,
+        key: str,
+        description: dict[str, Any],
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+
+        self._value: Callable[[MeltemMetrics], Any] = description["value"]
+        self._attributes: Callable[[MeltemMetrics], dict[str, Any]] | None = description.get(
+            "attributes"
+        )
+
+        # Entity properties
+        self._attr_name = description["name"]
+        self._attr_unique_id = f"{entry.entry_id}_metric_{key}"
+        self._attr_native_unit_of_measurement = description.get("unit")
+        self._attr_device_class = description.get("device_class")
+        self._attr_state_class = description.get("state_class")
+        self._attr_icon = description.get("icon")
+        self._attr_has_entity_name = True
+        self._attr_should_poll = False
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_entity_registry_enabled_default = False
+        self._attr_device_info = _cloud_device_info(entry)
+
+    @property
+    def native_value(self) -> Any:
+        """Return the current value of the metric."""
+        return self._value(self.coordinator.metrics)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the details of the metric."""
+        if self._attributes is None:
+            return None
+        return self._attributes(self.coordinator.metrics)
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        # Metrics are most useful while updates are failing
+        return True
+
+
+def _cloud_device_info(entry: ConfigEntry) -> dict[str, Any]:
+    """Return the info of the service device representing the cloud account."""
+    return {
+        "identifiers": {(DOMAIN, entry.entry_id)},
+        "name": "Meltem Cloud",
+        "manufacturer": "Meltem",
+        "entry_type": DeviceEntryType.SERVICE,
+    }
@@ -0,0 +1,138 @@
+"""Services for the Meltem integration."""
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers import device_registry as dr
+
+from .const import (
+    DOMAIN,
+    SERVICE_PROFILE,
+    SERVICE_GET_STATISTICS,
+    ATTR_CYCLES,
+    ATTR_MEMORY,
+    ATTR_DEVICE_ID,
+    PROFILE_DEFAULT_CYCLES,
+    REGISTER_DEFINITIONS,
+    ADDITIONAL_REGISTERS,
+    STATISTICS_WINDOW,
+)
+from .coordinator import STATISTICS_CONVERTERS, MeltemCoordinator
+from .profiler import CycleProfiler
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CYCLES, default=PROFILE_DEFAULT_CYCLES): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=1000)
+        ),
+        vol.Optional(ATTR_MEMORY, default=False): cv.boolean,
+    }
+)
+
+GET_STATISTICS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
+
+def _coordinators(hass: HomeAssistant) -> list[MeltemCoordinator]:
+    """Return the coordinators of all loaded config entries."""
+    return list(hass.data.get(DOMAIN, {}).values())
+
+
+async def _async_profile(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Profile the next update cycles and write the results to the config directory."""
+    coordinators = _coordinators(hass)
+    if any(
+        coordinator.profiler is not None and coordinator.profiler.active
+        for coordinator in coordinators
+    ):
+        raise HomeAssistantError("A Meltem profile is already being recorded")
+
+    profiler = CycleProfiler(hass, call.data[ATTR_CYCLES], call.data[ATTR_MEMORY])
+    for coordinator in coordinators:
+        coordinator.profiler = profiler
+    profiler.async_start()
+
+
+def _meltem_device_ids(hass: HomeAssistant, device_ids: list[str]) -> set[str]:
+    """Return the Meltem IDs of the given device registry entries."""
+    registry = dr.async_get(hass)
+    meltem_ids = set()
+    for device_id in device_ids:
+        device = registry.async_get(device_id)
+        if device is None:
+            raise HomeAssistantError(f"Unknown device: {device_id}")
+        meltem_ids.update(
+            identifier for domain, identifier in device.identifiers if domain == DOMAIN
+        )
+    return meltem_ids
+
+
+@callback
+def _async_get_statistics(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Return the min, max and mean of the measurement registers over the statistics window."""
+    selected = (
+        _meltem_device_ids(hass, call.data[ATTR_DEVICE_ID])
+        if ATTR_DEVICE_ID in call.data
+        else None
+    )
+    definitions = {**REGISTER_DEFINITIONS, **ADDITIONAL_REGISTERS}
+    devices: dict[str, Any] = {}
+    for coordinator in _coordinators(hass):
+        for device_id, device in coordinator.data.devices.items():
+            if selected is not None and device_id not in selected:
+                continue
+            registers = {}
+            for register in STATISTICS_CONVERTERS:
+                summary = coordinator.register_statistics(device_id, register)
+                if summary is not None:
+                    registers[str(register)] = {
+                        "name": definitions[register]["name"],
+                        "unit": definitions[register].get("unit"),
+                        **summary,
+                    }
+            devices[device_id] = {"name": device.get("name"), "registers": registers}
+    return {"window": STATISTICS_WINDOW, "devices": devices}
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+    if hass.services.has_service(DOMAIN, SERVICE_PROFILE):
+        return
+
+    async def async_profile(call: ServiceCall) -> None:
+        await _async_profile(hass, call)
+
+    hass.services.async_register(DOMAIN, SERVICE_PROFILE, async_profile, schema=PROFILE_SCHEMA)
+
+    async def async_get_statistics(call: ServiceCall) -> ServiceResponse:
+        return _async_get_statistics(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_STATISTICS,
+        async_get_statistics,
+        schema=GET_STATISTICS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove the services once no config entry is loaded."""
+    if _coordinators(hass):
+        return
+    hass.services.async_remove(DOMAIN, SERVICE_PROFILE)
+    hass.services.async_remove(DOMAIN, SERVICE_GET_STATISTICS)
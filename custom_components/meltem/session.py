@@ -0,0 +1,70 @@
+"""HTTP session shared by the Meltem config entries and config flows."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+import logging
+
+import aiohttp
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+
+from .api import create_session
+from .const import DATA_SESSION_POOL
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class SessionPool:
+    """Reference counted HTTP session.
+
+    Every account and config flow talks to the same API host, so they share
+    one session and reuse its kept-alive connections and TLS sessions. The
+    session is closed when its last user releases it, or when Home Assistant
+    closes, since config entries are not unloaded at shutdown.
+    """
+
+    session: aiohttp.ClientSession | None = None
+    users: int = 0
+    # Removes the listener closing the session when Home Assistant closes
+    remove_close_listener: Callable[[], None] | None = None
+
+
+@callback
+def async_acquire_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Return the shared session, creating it for the first user."""
+    pool: SessionPool = hass.data.setdefault(DATA_SESSION_POOL, SessionPool())
+    if pool.session is None or pool.session.closed:
+        _LOGGER.debug("Creating shared HTTP session")
+        pool.session = create_session()
+    if pool.remove_close_listener is None:
+
+        async def _async_close_session(_: Event) -> None:
+            """Close the session when Home Assistant closes."""
+            pool.remove_close_listener = None
+            if pool.session is not None:
+                session, pool.session = pool.session, None
+                await session.close()
+
+        pool.remove_close_listener = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_CLOSE, _async_close_session
+        )
+    pool.users += 1
+    return pool.session
+
+
+async def async_release_session(hass: HomeAssistant) -> None:
+    """Release the shared session, closing it once nobody uses it."""
+    pool: SessionPool | None = hass.data.get(DATA_SESSION_POOL)
+    if pool is None or pool.users == 0:
+        return
+    pool.users -= 1
+    if pool.users == 0 and pool.session is not None:
+        _LOGGER.debug("Closing shared HTTP session")
+        if pool.remove_close_listener is not None:
+            pool.remove_close_listener()
+            pool.remove_close_listener = None
+        session, pool.session = pool.session, None
+        await session.close()
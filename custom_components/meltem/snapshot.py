@@ -0,0 +1,169 @@
+"""Compact register snapshot store for the Meltem integration."""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable
+from typing import Any
+
+
+class DeviceSnapshot:
+    """Latest register values of one device, kept in preallocated columns.
+
+    Column i holds the register at index i of the store's register index.
+    """
+
+    __slots__ = ("values", "statuses", "last_updates", "present")
+
+    def __init__(self, size: int) -> None:
+        """Initialize empty columns."""
+        self.values: list[Any] = [None] * size
+        self.statuses = array("i", bytes(4 * size))  # 0 = no status reported
+        self.last_updates = array("q", bytes(8 * size))  # ms since epoch, 0 = unknown
+        self.present = bytearray(size)
+
+    def set(
+        self,
+        index: int,
+        value: Any,
+        status: int | None,
+        last_update: int | None,
+    ) -> bool:
+        """Store a register sample and return True if its value or status changed."""
+        status = status or 0
+        changed = (
+            not self.present[index]
+            or self.values[index] != value
+            or self.statuses[index] != status
+        )
+        self.values[index] = value
+        self.statuses[index] = status
+        self.last_updates[index] = last_update or 0
+        self.present[index] = 1
+        return changed
+
+    def clear(self, index: int) -> bool:
+        """Remove a register sample and return True if one was stored."""
+        if not self.present[index]:
+            return False
+        self.values[index] = None
+        self.statuses[index] = 0
+        self.last_updates[index] = 0
+        self.present[index] = 0
+        return True
+
+
+class SnapshotStore:
+    """Register snapshots of all devices of an account.
+
+    Register addresses are mapped to fixed column indexes once, and every
+    device gets one DeviceSnapshot that is updated in place on each poll.
+    """
+
+    __slots__ = ("index", "bridges", "devices", "_snapshots")
+
+    def __init__(self, registers: Iterable[int]) -> None:
+        """Initialize the store for the given register addresses."""
+        self.index: dict[int, int] = {
+            register: index for index, register in enumerate(registers)
+        }
+        self.bridges: dict[str, Any] = {}
+        self.devices: dict[str, Any] = {}
+        self._snapshots: dict[str, DeviceSnapshot] = {}
+
+    def has_device(self, device_id: str) -> bool:
+        """Return True if data has been stored for a device."""
+        return device_id in self._snapshots
+
+    def device(self, device_id: str) -> DeviceSnapshot:
+        """Return the snapshot of a device, creating an empty one if needed."""
+        snapshot = self._snapshots.get(device_id)
+        if snapshot is None:
+            snapshot = self._snapshots[device_id] = DeviceSnapshot(len(self.index))
+        return snapshot
+
+    def retain_devices(self, device_ids: Iterable[str]) -> None:
+        """Drop the snapshots of all devices not in device_ids."""
+        keep = set(device_ids)
+        for device_id in self._snapshots.keys() - keep:
+            del self._snapshots[device_id]
+
+    def has(self, device_id: str, register: int) -> bool:
+        """Return True if a register of a device holds a value or status."""
+        snapshot = self._snapshots.get(device_id)
+        index = self.index.get(register)
+        return (
+            snapshot is not None
+            and index is not None
+            and bool(snapshot.present[index])
+        )
+
+    def value(self, device_id: str, register: int) -> Any:
+        """Return the value of a register of a device, or None."""
+        snapshot = self._snapshots.get(device_id)
+        index = self.index.get(register)
+        if snapshot is None or index is None:
+            return None
+        return snapshot.values[index]
+
+    def get(self, device_id: str, register: int, default: Any = None) -> Any:
+        """Return the value of a register of a device, or default if it holds no sample."""
+        snapshot = self._snapshots.get(device_id)
+        index = self.index.get(register)
+        if snapshot is None or index is None or not snapshot.present[index]:
+            return default
+        return snapshot.values[index]
+
+    def status(self, device_id: str, register: int) -> int | None:
+        """Return the status code reported for a register of a device, or None."""
+        snapshot = self._snapshots.get(device_id)
+        index = self.index.get(register)
+        if snapshot is None or index is None:
+            return None
+        return snapshot.statuses[index] or None
+
+    def last_update(self, device_id: str, register: int) -> int | None:
+        """Return the cloud timestamp (ms) of a register sample, or None."""
+        snapshot = self._snapshots.get(device_id)
+        index = self.index.get(register)
+        if snapshot is None or index is None or not snapshot.present[index]:
+            return None
+        return snapshot.last_updates[index] or None
+
+    def registers(self, device_id: str) -> list[int]:
+        """Return the registers of a device that hold a value or status."""
+        snapshot = self._snapshots.get(device_id)
+        if snapshot is None:
+            return []
+        return [
+            register
+            for register, index in self.index.items()
+            if snapshot.present[index]
+        ]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the topology and all register samples as a JSON serializable dict."""
+        snapshots = {}
+        for device_id, snapshot in self._snapshots.items():
+            snapshots[device_id] = {
+                str(register): [
+                    snapshot.values[index],
+                    snapshot.statuses[index] or None,
+                    snapshot.last_updates[index] or None,
+                ]
+                for register, index in self.index.items()
+                if snapshot.present[index]
+            }
+        return {"bridges": self.bridges, "devices": self.devices, "snapshots": snapshots}
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """Load a dict returned by as_dict(), skipping registers this store does not track."""
+        self.bridges = data.get("bridges", {})
+        self.devices = data.get("devices", {})
+        for device_id, samples in data.get("snapshots", {}).items():
+            if device_id not in self.devices:
+                continue
+            snapshot = self.device(device_id)
+            for register, (value, status, last_update) in samples.items():
+                index = self.index.get(int(register))
+                if index is not None:
+                    snapshot.set(index, value, status, last_update)
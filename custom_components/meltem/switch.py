@@ -5,12 +5,14 @@ from typing import Any
 
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     DOMAIN,
+    SIGNAL_NEW_ENTITIES,
     VENTILATION_STATUS_REGISTER,
 )
 from .coordinator import MeltemCoordinator
@@ -24,7 +26,7 @@ async def async_setup_entry(
     coordinator: MeltemCoordinator = hass.data[DOMAIN][entry.entry_id]
 
     entities = []
-    for device_id, device in coordinator.data["devices"].items():
+    for device_id, device in coordinator.data.devices.items():
         entities.append(
             MeltemVentilationSwitch(
                 coordinator,
@@ -35,6 +37,25 @@ async def async_setup_entry(
 
     async_add_entities(entities)
 
+    @callback
+    def _async_add_new_devices(
+        new_devices: list[str],
+        new_registers: dict[str, set[int]],
+    ) -> None:
+        """Add entities for devices that appeared after setup."""
+        async_add_entities(
+            MeltemVentilationSwitch(coordinator, device_id, coordinator.data.devices[device_id])
+            for device_id in new_devices
+        )
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_NEW_ENTITIES.format(entry.entry_id),
+            _async_add_new_devices,
+        )
+    )
+
 
 class MeltemVentilationSwitch(CoordinatorEntity, SwitchEntity):
     """Representation of a Meltem ventilation on/off switch."""
@@ -46,7 +67,11 @@ class MeltemVentilationSwitch(CoordinatorEntity, SwitchEntity):
         device_info: dict,
     ) -> None:
         """Initialize the switch entity."""
-        super().__init__(coordinator)
+        # Only notified when the register it displays changes
+        super().__init__(
+            coordinator,
+            context=frozenset({(device_id, VENTILATION_STATUS_REGISTER)}),
+        )
         self._device_id = device_id
         self._device_info = device_info
 
@@ -69,35 +94,34 @@ class MeltemVentilationSwitch(CoordinatorEntity, SwitchEntity):
     @property
     def is_on(self) -> bool | None:
         """Return True if entity is on."""
-        if not self.coordinator.data or not self.coordinator.data.get("data"):
+        if not self.coordinator.data:
             return None
 
-        device_data = self.coordinator.data["data"].get(self._device_id, {})
-        status_data = device_data.get(VENTILATION_STATUS_REGISTER)
+        value = self.coordinator.data.value(self._device_id, VENTILATION_STATUS_REGISTER)
 
-        if not status_data or "value" not in status_data:
+        if value is None:
             return None
 
-        return status_data.get("value") != 0
+        return value != 0
+
+    @property
+    def extra_state_attributes(self) -> dict[str, bool]:
+        """Return whether the last known data is shown while the API is unavailable."""
+        return {"stale": self.coordinator.stale}
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the entity on."""
         # If device was previously in manual mode, restore it to manual mode
-        device_data = self.coordinator.data["data"].get(self._device_id, {})
-        status_data = device_data.get(VENTILATION_STATUS_REGISTER)
+        value = self.coordinator.data.value(self._device_id, VENTILATION_STATUS_REGISTER)
 
-        if status_data and status_data.get("value") == 112:
+        if value == 112:
             # Restore manual mode
             await self.coordinator.async_set_ventilation_level(self._device_id, "manual")
         else:
             # Default to low speed when turning on
             await self.coordinator.async_set_ventilation_level(self._device_id, "low")
 
-        # Refresh live data for this device
-        await self.coordinator.async_refresh_device(self._device_id)
-
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the entity off."""
-        await self.coordinator.async_set_ventilation_level(self._device_id, "off")
-        # Refresh live data for this device
-        await self.coordinator.async_refresh_device(self._device_id)
\ No newline at end of file
+        # Setting the level already refreshes the live data of this device
+        await self.coordinator.async_set_ventilation_level(self._device_id, "off")
\ No newline at end of file